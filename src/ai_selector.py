@@ -3,11 +3,39 @@ AI News Selector - OpenAI kullanarak en kritik haberi seçer.
 """
 
 import os
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import re
 from typing import List, Dict, Optional
 import json
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from llm_cache import cached_chat_completion, is_json_response
+from openai_client import json_schema_format
+from history_index import max_similarity, HISTORY_SIMILARITY_THRESHOLD
+from prompt_builder import count_tokens, count_message_tokens, truncate_to_tokens, allocate_token_budget, SELECTION_CONTENT_TOKEN_BUDGET
+
+# Tek prompt'ta değerlendirilecek en fazla haber; fazlası turnuva ile seçilir
+SELECTION_SHARD_SIZE = int(os.getenv("SELECTION_SHARD_SIZE", "15"))
+
+# Turnuvada aynı anda çalışacak seçim çağrısı sayısı
+SELECTION_PARALLELISM = int(os.getenv("SELECTION_PARALLELISM", "4"))
+
+# Seçici yanıtını akış olarak okuyup selected_index gelince kes
+SELECTOR_STREAMING = os.getenv("SELECTOR_STREAMING", "1").lower() in ("1", "true", "yes")
+
+# Akışta tamamlanmış selected_index değeri (ardından ayırıcı gelmiş olmalı)
+SELECTED_INDEX_PATTERN = re.compile(r'"selected_index"\s*:\s*(-?\d+)\s*[,}]')
+
+SELECTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "selected_index": {"type": "integer"},
+        "reason": {"type": "string"},
+        "importance_score": {"type": "integer"}
+    },
+    "required": ["selected_index", "reason", "importance_score"],
+    "additionalProperties": False
+}
 
 SELECTION_PROMPT = """Sen deneyimli bir haber editörüsün. Polonya'da yaşayan Türk göçmenler için en önemli haberi seçmelisin.
 
@@ -25,11 +53,13 @@ Aşağıdaki haberleri analiz et ve aralarından EN KRİTİK olanı seç. Seçim
    - Spor haberleri → DÜŞÜK öncelik
    - Magazin/eğlence haberleri → DÜŞÜK öncelik
    - Yerel/bölgesel olaylar (ülke genelini etkilemiyorsa) → DÜŞÜK öncelik
+   - Son günlerde paylaşılan konunun tekrarı (TEKRAR notu olan) → DÜŞÜK öncelik
 
 3. **Seçim Kriterleri:**
    - Ciddiyet derecesi en yüksek olan
    - En geniş kitleyi etkileyen
    - Aciliyet içeren (yeni yürürlüğe giren yasalar, yaklaşan son tarihler)
+   - Birden fazla kaynakta yer alan (KAPSAM değeri yüksek) haberler
 
 HABERLERİ ANALİZ ET:
 {news_list}
@@ -43,29 +73,108 @@ YANIT FORMATI (Sadece JSON döndür):
 """
 
 
-def create_news_list_text(news_items: List[Dict]) -> str:
-    """Haber listesini prompt için formatlar."""
-    news_text = ""
-    for i, item in enumerate(news_items):
-        content = item.get('content') or item.get('description', '')
-        # İçeriği kısalt
-        if len(content) > 500:
-            content = content[:500] + "..."
-        
-        news_text += f"""
+def _format_news_block(index: int, item: Dict, content: str) -> str:
+    """Tek bir haberi prompt bloğu olarak formatlar."""
+    coverage = item.get('coverage', 1)
+    coverage_line = f"KAPSAM: {coverage} kaynakta yer aldı\n" if coverage > 1 else ""
+    if item.get('recently_posted_topic'):
+        coverage_line += "TEKRAR: Son günlerde benzer bir haber paylaşıldı\n"
+    
+    return f"""
 ---
-[{i}] BAŞLIK: {item.get('title', 'Başlık yok')}
+[{index}] BAŞLIK: {item.get('title', 'Başlık yok')}
 TARİH: {item.get('published', 'Tarih yok')}
 KAYNAK: {item.get('source', 'Kaynak yok')}
 KATEGORİ: {item.get('category', 'Kategori yok')}
-İÇERİK: {content}
+{coverage_line}İÇERİK: {content}
 ---
 """
-    return news_text
+
+
+def create_news_list_text(news_items: List[Dict], token_budget: int = SELECTION_CONTENT_TOKEN_BUDGET) -> str:
+    """Haber listesini prompt için formatlar.
+    
+    İçerikler token bütçesine sığacak şekilde, listedeki sıraya (önceliğe)
+    göre paylaştırılır ve cümle sınırlarından kısaltılır.
+    """
+    contents = [
+        item.get('clean_content') or item.get('content') or item.get('description', '')
+        for item in news_items
+    ]
+    needs = [count_tokens(content) for content in contents]
+    allocation = allocate_token_budget(needs, token_budget)
+    
+    blocks = [
+        _format_news_block(i, item, truncate_to_tokens(content, tokens))
+        for i, (item, content, tokens) in enumerate(zip(news_items, contents, allocation))
+    ]
+    return "".join(blocks)
+
+
+def _has_selected_index(result_text: str) -> bool:
+    """Yanıt (akışta erken kesilmiş olsa bile) selected_index içeriyor mu?"""
+    return bool(SELECTED_INDEX_PATTERN.search(result_text)) or is_json_response(result_text)
+
+
+def _parse_selection(result_text: str) -> Dict:
+    """Seçim yanıtını okur; akış erken kesildiyse sadece selected_index döner."""
+    # Markdown code block varsa temizle
+    if result_text.startswith("```"):
+        result_text = result_text.split("```")[1]
+        if result_text.startswith("json"):
+            result_text = result_text[4:]
+    
+    try:
+        return json.loads(result_text)
+    except json.JSONDecodeError:
+        match = SELECTED_INDEX_PATTERN.search(result_text)
+        if not match:
+            raise
+        return {"selected_index": int(match.group(1))}
+
+
+def demote_recent_topics(news_items: List[Dict]) -> List[Dict]:
+    """Son günlerde paylaşılan konulara çok benzeyen adayları listenin sonuna taşır.
+    
+    Benzerlik 'history_similarity' alanına yazılır; sıra diğer haberler için korunur.
+    """
+    if not news_items:
+        return news_items
+    
+    try:
+        similarities = max_similarity([
+            f"{item.get('title', '')} {item.get('clean_content') or item.get('content') or item.get('description', '')}"
+            for item in news_items
+        ])
+    except Exception as e:
+        print(f"Geçmiş benzerliği hesaplanamadı: {e}")
+        return news_items
+    
+    fresh, repeated = [], []
+    for item, similarity in zip(news_items, similarities):
+        item['history_similarity'] = round(float(similarity), 3)
+        item['recently_posted_topic'] = bool(similarity >= HISTORY_SIMILARITY_THRESHOLD)
+        if item['recently_posted_topic']:
+            repeated.append(item)
+        else:
+            fresh.append(item)
+    
+    if repeated:
+        print(f"Son günlerde paylaşılan konulara benzeyen {len(repeated)} haber geri sıraya alındı.")
+    return fresh + repeated
 
 
 def select_most_important_news(news_items: List[Dict]) -> Optional[Dict]:
-    """OpenAI ile en kritik haberi seçer."""
+    """OpenAI ile en kritik haberi seçer.
+    
+    Son günlerde paylaşılan konulara benzeyen adaylar önce geri sıraya alınır.
+    Haber sayısı SELECTION_SHARD_SIZE'ı aşarsa turnuva moduna geçer.
+    """
+    return _select_news(demote_recent_topics(news_items))
+
+
+def _select_news(news_items: List[Dict], shard_size: int = SELECTION_SHARD_SIZE) -> Optional[Dict]:
+    """Tek prompt ile (veya haber sayısı shard_size'ı aşarsa turnuva ile) seçim yapar."""
     if not news_items:
         print("Haber listesi boş!")
         return None
@@ -74,36 +183,34 @@ def select_most_important_news(news_items: List[Dict]) -> Optional[Dict]:
         print("Tek haber var, direkt seçildi.")
         return news_items[0]
     
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    if len(news_items) > shard_size:
+        return select_with_tournament(news_items, shard_size)
     
     news_list_text = create_news_list_text(news_items)
     prompt = SELECTION_PROMPT.format(news_list=news_list_text)
+    messages = [
+        {"role": "system", "content": "Sen bir haber editörüsün. Sadece JSON formatında yanıt ver."},
+        {"role": "user", "content": prompt}
+    ]
+    print(f"Seçim prompt'u: {count_message_tokens(messages)} token ({len(news_items)} haber)")
     
     try:
-        response = client.chat.completions.create(
+        result_text = cached_chat_completion(
             model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "Sen bir haber editörüsün. Sadece JSON formatında yanıt ver."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=messages,
             temperature=0.3,
+            validate=_has_selected_index,
+            stream_until=SELECTED_INDEX_PATTERN if SELECTOR_STREAMING else None,
+            response_format=json_schema_format("news_selection", SELECTION_SCHEMA),
             max_tokens=500
         )
         
-        result_text = response.choices[0].message.content.strip()
-        
-        # JSON parse
-        # Markdown code block varsa temizle
-        if result_text.startswith("```"):
-            result_text = result_text.split("```")[1]
-            if result_text.startswith("json"):
-                result_text = result_text[4:]
-        
-        result = json.loads(result_text)
+        result = _parse_selection(result_text)
         
         selected_index = result.get("selected_index", 0)
-        print(f"AI Seçimi: [{selected_index}] - {result.get('reason')}")
-        print(f"Önem Puanı: {result.get('importance_score')}/10")
+        print(f"AI Seçimi: [{selected_index}] - {result.get('reason', '(akış erken kesildi)')}")
+        if result.get('importance_score') is not None:
+            print(f"Önem Puanı: {result.get('importance_score')}/10")
         
         if 0 <= selected_index < len(news_items):
             return news_items[selected_index]
@@ -114,12 +221,49 @@ def select_most_important_news(news_items: List[Dict]) -> Optional[Dict]:
     except json.JSONDecodeError as e:
         print(f"JSON parse hatası: {e}")
         print(f"Ham yanıt: {result_text}")
+        print("⚠️ Yedek seçim: AI yanıtı okunamadı, ilk haber seçildi.")
         return news_items[0]
     except Exception as e:
-        print(f"OpenAI API hatası: {e}")
+        print(f"OpenAI API hatası (tekrar denemeler sonrası): {type(e).__name__}: {e}")
+        print("⚠️ Yedek seçim: AI seçimi yapılamadı, ilk haber seçildi.")
         return news_items[0]
 
 
+def _split_shards(news_items: List[Dict], shard_size: int) -> List[List[Dict]]:
+    """Haberleri sıra gözetmeden dönüşümlü (round-robin) parçalara böler.
+    
+    Böylece ön sıralamada üst sıralardaki haberler aynı parçada birbirini elemez.
+    """
+    shard_count = -(-len(news_items) // shard_size)
+    return [news_items[i::shard_count] for i in range(shard_count)]
+
+
+def select_with_tournament(news_items: List[Dict], shard_size: int = SELECTION_SHARD_SIZE,
+                           parallelism: int = SELECTION_PARALLELISM) -> Optional[Dict]:
+    """Büyük aday havuzundan turnuva ile seçim yapar.
+    
+    Havuz parçalara bölünür, parça seçimleri eş zamanlı yapılır ve kazananlar
+    tek parçaya sığana kadar yeni turlara girer. Son tur SELECTION_PROMPT ile
+    normal seçimdir; tur sayısı havuz boyutuyla logaritmik artar.
+    """
+    shard_size = max(2, shard_size)
+    candidates = news_items
+    round_number = 1
+    
+    while len(candidates) > shard_size:
+        shards = _split_shards(candidates, shard_size)
+        print(f"Turnuva turu {round_number}: {len(candidates)} haber, {len(shards)} parça")
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(parallelism, len(shards)))) as executor:
+            winners = list(executor.map(partial(_select_news, shard_size=shard_size), shards))
+        
+        candidates = [winner for winner in winners if winner]
+        round_number += 1
+    
+    print(f"Turnuva final turu: {len(candidates)} haber")
+    return _select_news(candidates, shard_size)
+
+
 if __name__ == "__main__":
     # Test
     from rss_parser import get_poland_news_all
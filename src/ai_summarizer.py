@@ -3,15 +3,63 @@ AI News Summarizer - OpenAI kullanarak haberi kısa ve öz şekilde özetler.
 """
 
 import os
-from openai import OpenAI
-from typing import Dict, Optional
+import re
+from typing import Dict, List, Optional, Tuple
 import json
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from llm_cache import cached_chat_completion, is_json_response, cache_stats
+from openai_client import create_chat_completion, json_schema_format
+from prompt_builder import count_tokens, count_message_tokens, truncate_to_tokens, allocate_token_budget, SUMMARY_CONTENT_TOKEN_BUDGET
 
-SUMMARY_PROMPT = """Sen deneyimli bir Türk haber yazarısın. Aşağıdaki haberi Türkçe olarak KISA VE ÖZ şekilde özetleyeceksin.
+SUMMARY_MODEL = "gpt-4o"
+SUMMARY_SYSTEM_MESSAGE = "Sen profesyonel bir haber yazarısın. Kısa, öz ve tam cümlelerle yaz. Sadece JSON formatında yanıt ver."
+SUMMARY_MAX_LENGTH = 180
+SUMMARY_MIN_KEYWORDS = 3
+SUMMARY_MAX_KEYWORDS = 5
+
+# Doğrulamayı geçemeyen özet için en fazla düzeltme isteği
+SUMMARY_MAX_REPAIRS = int(os.getenv("SUMMARY_MAX_REPAIRS", "2"))
+
+# Bu çalışmadaki doğrulama/düzeltme sayaçları
+_repair_stats = {"validations": 0, "repair_requests": 0, "repair_prompt_tokens": 0, "repaired": 0, "unrepaired": 0}
+
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "keywords": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["summary", "keywords"],
+    "additionalProperties": False
+}
+
+BATCH_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summaries": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "summary": {"type": "string"},
+                    "keywords": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["index", "summary", "keywords"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["summaries"],
+    "additionalProperties": False
+}
+
+# Toplu özet ayarları
+SUMMARY_BATCH_CONTENT_TOKEN_BUDGET = int(os.getenv("SUMMARY_BATCH_CONTENT_TOKEN_BUDGET", "4000"))
+SUMMARY_BATCH_TOKENS_PER_ITEM = 150
+SUMMARY_BATCH_MAX_ROUNDS = 3
 
-KRİTİK KURALLAR:
+SUMMARY_RULES = """KRİTİK KURALLAR:
 
 1. **UZUNLUK SINIRI:**
    - TOPLAM maksimum 180 karakter (boşluklar dahil)
@@ -38,7 +86,11 @@ KRİTİK KURALLAR:
    - Aktif cümleler
    - Kısa ve net
 
-HABER:
+"""
+
+SUMMARY_PROMPT = """Sen deneyimli bir Türk haber yazarısın. Aşağıdaki haberi Türkçe olarak KISA VE ÖZ şekilde özetleyeceksin.
+
+""" + SUMMARY_RULES + """HABER:
 Başlık: {title}
 İçerik: {content}
 Kaynak: {source}
@@ -52,6 +104,249 @@ YANIT FORMATI (Sadece JSON döndür):
 }}
 """
 
+BATCH_SUMMARY_PROMPT = """Sen deneyimli bir Türk haber yazarısın. Aşağıdaki HER haberi ayrı ayrı Türkçe olarak KISA VE ÖZ şekilde özetleyeceksin.
+
+""" + SUMMARY_RULES + """HABERLER:
+{news_list}
+
+ÖNEMLİ: Her özet 180 karakteri geçmemeli ve her cümle nokta ile bitmeli!
+
+YANIT FORMATI (Sadece JSON döndür, her haber için bir eleman):
+{{
+    "summaries": [
+        {{
+            "index": <haberin index numarası>,
+            "summary": "<maksimum 180 karakter özet, nokta ile biten tam cümleler>",
+            "keywords": ["<3-5 anahtar kelime>"]
+        }}
+    ]
+}}
+"""
+
+REPAIR_PROMPT = """Aşağıdaki haber özeti kurallara uymuyor. Sadece belirtilen hataları düzelt, anlamı ve özel isimleri koru.
+
+ÖZET: {summary}
+ANAHTAR KELİMELER: {keywords}
+
+HATALAR:
+{errors}
+{source_numerals}
+KURALLAR: Maksimum 180 karakter, her cümle nokta ile biten tam cümle, 3-5 anahtar kelime.
+
+YANIT FORMATI (Sadece JSON döndür):
+{{
+    "summary": "<düzeltilmiş özet>",
+    "keywords": ["<3-5 anahtar kelime>"]
+}}
+"""
+
+
+def _news_content(news_item: Dict, token_budget: int = SUMMARY_CONTENT_TOKEN_BUDGET) -> str:
+    """Prompt'a girecek, token bütçesine kısaltılmış haber içeriğini döner."""
+    content = news_item.get('clean_content') or news_item.get('content') or news_item.get('description', '')
+    return truncate_to_tokens(content, token_budget)
+
+
+def _build_summary_messages(news_item: Dict) -> List[Dict]:
+    """Tek haber özeti için chat mesajlarını oluşturur."""
+    prompt = SUMMARY_PROMPT.format(
+        title=news_item.get('title', ''),
+        content=_news_content(news_item),
+        source=news_item.get('source', '')
+    )
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _parse_json_text(result_text: str) -> Dict:
+    """Yanıt metnini (varsa markdown code block'u temizleyerek) JSON olarak okur."""
+    # Markdown code block varsa temizle
+    if result_text.startswith("```"):
+        result_text = result_text.split("```")[1]
+        if result_text.startswith("json"):
+            result_text = result_text[4:]
+    
+    return json.loads(result_text)
+
+
+def _finalize_summary_text(summary_text: str) -> str:
+    """Nokta ile bitmeyen özeti son tam cümlesinden keser."""
+    # Son kontrol: nokta ile bitmiyor mu?
+    if summary_text and not summary_text.endswith('.'):
+        # Son cümleyi bul ve kes
+        last_period = summary_text.rfind('.')
+        if last_period > 0:
+            summary_text = summary_text[:last_period + 1]
+    return summary_text
+
+
+# Tarih (01.01.2026), ya da boşluk/nokta/virgül ile gruplanmış sayı (4 806, 1.234,5)
+_DATE_RE = re.compile(r"\d{1,4}[./-]\d{1,2}[./-]\d{2,4}")
+_NUMBER_RE = re.compile(r"\d{1,4}[./-]\d{1,2}[./-]\d{2,4}|\d+(?:[ \u00a0\u202f.,]\d+)*")
+_NUMBER_SEPARATOR_RE = re.compile(r"([ \u00a0\u202f.,])")
+
+
+def _parse_number(token: str) -> Tuple[Optional[float], List[float]]:
+    """Sayı token'ını (değer, parçalar) olarak çözer.
+    
+    Binlik gruplar birleştirilir (4 806 -> 4806), ondalık ayırıcı korunur (3,5 -> 3.5),
+    tarihler parçalarına ayrılır (01.01.2026 -> 1, 1, 2026). Değer belirsizse None döner.
+    """
+    if _DATE_RE.fullmatch(token):
+        return None, [int(part) for part in re.split(r"[./-]", token)]
+    
+    pieces = _NUMBER_SEPARATOR_RE.split(token)
+    groups, separators = pieces[0::2], pieces[1::2]
+    parts = [int(group) for group in groups]
+    if len(groups) == 1:
+        return parts[0], parts
+    
+    thousands = len(groups[0]) <= 3 and all(len(group) == 3 for group in groups[1:-1])
+    if thousands and len(groups[-1]) == 3:
+        return int("".join(groups)), parts
+    if (thousands or len(groups) == 2) and separators[-1] in ".,":
+        return float(f"{''.join(groups[:-1])}.{groups[-1]}"), parts
+    return None, parts
+
+
+def _numbers(text: str) -> List[Tuple[str, Optional[float], List[float]]]:
+    """Metindeki sayıları (ham metin, değer, parçalar) olarak döner."""
+    return [(token.strip(), *_parse_number(token.strip())) for token in _NUMBER_RE.findall(text or "")]
+
+
+def validate_summary(summary: Dict, news_item: Optional[Dict] = None) -> List[str]:
+    """Özeti SUMMARY_PROMPT kurallarına göre yerel olarak doğrular, hata listesi döner.
+    
+    Kontroller: uzunluk, cümle bütünlüğü, kaynakta olmayan sayı ve anahtar kelime sayısı.
+    news_item verilmezse sayı kontrolü atlanır.
+    """
+    errors = []
+    summary_text = (summary or {}).get("full_text", "")
+    keywords = (summary or {}).get("keywords") or []
+    
+    if not summary_text:
+        return ["Özet boş."]
+    
+    if len(summary_text) > SUMMARY_MAX_LENGTH:
+        errors.append(f"Özet {len(summary_text)} karakter, en fazla {SUMMARY_MAX_LENGTH} karakter olmalı.")
+    
+    if not summary_text.endswith('.') or summary_text.endswith('...'):
+        errors.append("Son cümle yarım kalmış, her cümle nokta ile bitmeli.")
+    
+    if news_item:
+        source_text = " ".join(
+            news_item.get(key) or "" for key in ('title', 'clean_content', 'content', 'description')
+        )
+        # Kaynakta hem birleşik değerler hem de tek tek parçalar kabul edilir
+        source_numbers = set()
+        for _, value, parts in _numbers(source_text):
+            source_numbers.update(parts)
+            if value is not None:
+                source_numbers.add(value)
+        missing = [
+            token for token, value, parts in _numbers(summary_text)
+            if value not in source_numbers and not all(part in source_numbers for part in parts)
+        ]
+        if missing:
+            errors.append(f"Kaynakta olmayan sayılar kullanılmış: {', '.join(missing)}.")
+    
+    if not SUMMARY_MIN_KEYWORDS <= len(keywords) <= SUMMARY_MAX_KEYWORDS:
+        errors.append(f"{len(keywords)} anahtar kelime var, {SUMMARY_MIN_KEYWORDS}-{SUMMARY_MAX_KEYWORDS} olmalı.")
+    
+    return errors
+
+
+def is_valid_summary(summary: Dict, news_item: Optional[Dict] = None) -> bool:
+    """Özet tüm yerel kontrollerden geçiyor mu?"""
+    return not validate_summary(summary, news_item)
+
+
+def _request_repair(summary: Dict, errors: List[str], news_item: Dict) -> Optional[Dict]:
+    """Sadece hatalı özeti ve hataları içeren küçük bir düzeltme isteği gönderir."""
+    source_numerals = ""
+    if any("sayı" in error for error in errors):
+        source_text = f"{news_item.get('title', '')} {news_item.get('clean_content') or news_item.get('content', '')}"
+        numbers = [token for token, _, _ in _numbers(source_text)]
+        source_numerals = f"Kaynaktaki sayılar: {', '.join(dict.fromkeys(numbers)) or 'yok'}\n"
+    
+    prompt = REPAIR_PROMPT.format(
+        summary=summary.get("full_text", ""),
+        keywords=", ".join(summary.get("keywords") or []),
+        errors="\n".join(f"- {error}" for error in errors),
+        source_numerals=source_numerals
+    )
+    
+    messages = [
+        {"role": "system", "content": SUMMARY_SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+    
+    cache_hits = cache_stats()["hits"]
+    result_text = cached_chat_completion(
+        model=SUMMARY_MODEL,
+        messages=messages,
+        temperature=0.2,
+        validate=is_json_response,
+        response_format=json_schema_format("news_summary", SUMMARY_SCHEMA),
+        max_tokens=200
+    )
+    
+    # Sadece gerçekten API'ye giden istekler maliyete sayılır
+    if cache_stats()["hits"] == cache_hits:
+        _repair_stats["repair_requests"] += 1
+        _repair_stats["repair_prompt_tokens"] += count_message_tokens(messages)
+    
+    result = _parse_json_text(result_text)
+    return {
+        "full_text": _finalize_summary_text(result.get("summary", "")),
+        "keywords": result.get("keywords", summary.get("keywords", []))
+    }
+
+
+def repair_summary(summary: Dict, news_item: Dict, max_repairs: int = SUMMARY_MAX_REPAIRS) -> Dict:
+    """Özeti doğrular; hatalıysa en fazla max_repairs kez hedefli düzeltme ister.
+    
+    Düzeltilemezse son özet 'valid': False ile döner.
+    """
+    errors = validate_summary(summary, news_item)
+    _repair_stats["validations"] += 1
+    
+    attempt = 0
+    while errors and attempt < max_repairs:
+        attempt += 1
+        print(f"Özet doğrulanamadı ({'; '.join(errors)}), düzeltme isteniyor ({attempt}/{max_repairs})...")
+        try:
+            repaired = _request_repair(summary, errors, news_item) or summary
+        except Exception as e:
+            print(f"Özet düzeltme hatası: {type(e).__name__}: {e}")
+            break
+        
+        # Aynı özet dönerse sonraki düzeltme prompt'u birebir aynı olur (cache'ten boşa döner)
+        unchanged = (repaired.get("full_text") == summary.get("full_text")
+                     and repaired.get("keywords") == summary.get("keywords"))
+        summary = repaired
+        if unchanged:
+            print("Düzeltme özeti değiştirmedi, tekrar denenmiyor.")
+            break
+        errors = validate_summary(summary, news_item)
+        _repair_stats["validations"] += 1
+    
+    if errors:
+        _repair_stats["unrepaired"] += 1
+        print(f"⚠️ Özet düzeltilemedi: {'; '.join(errors)}")
+    elif attempt:
+        _repair_stats["repaired"] += 1
+    
+    summary["valid"] = not errors
+    return summary
+
+
+def repair_stats() -> Dict[str, int]:
+    """Doğrulama/düzeltme sayaçlarını döner (ek API çağrısı maliyetini ölçmek için)."""
+    return dict(_repair_stats)
+
 
 def summarize_news(news_item: Dict) -> Optional[Dict]:
     """Haberi kısa ve öz şekilde özetler."""
@@ -59,50 +354,29 @@ def summarize_news(news_item: Dict) -> Optional[Dict]:
         print("Haber boş!")
         return None
     
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    
-    content = news_item.get('content') or news_item.get('description', '')
-    
-    prompt = SUMMARY_PROMPT.format(
-        title=news_item.get('title', ''),
-        content=content,
-        source=news_item.get('source', '')
-    )
+    messages = _build_summary_messages(news_item)
+    print(f"Özet prompt'u: {count_message_tokens(messages)} token")
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "Sen profesyonel bir haber yazarısın. Kısa, öz ve tam cümlelerle yaz. Sadece JSON formatında yanıt ver."},
-                {"role": "user", "content": prompt}
-            ],
+        result_text = cached_chat_completion(
+            model=SUMMARY_MODEL,
+            messages=messages,
             temperature=0.3,
+            validate=is_json_response,
+            response_format=json_schema_format("news_summary", SUMMARY_SCHEMA),
             max_tokens=300
         )
         
-        result_text = response.choices[0].message.content.strip()
-        
-        # Markdown code block varsa temizle
-        if result_text.startswith("```"):
-            result_text = result_text.split("```")[1]
-            if result_text.startswith("json"):
-                result_text = result_text[4:]
-        
-        result = json.loads(result_text)
+        result = _parse_json_text(result_text)
         
-        summary_text = result.get("summary", "")
-        
-        # Son kontrol: nokta ile bitmiyor mu?
-        if summary_text and not summary_text.endswith('.'):
-            # Son cümleyi bul ve kes
-            last_period = summary_text.rfind('.')
-            if last_period > 0:
-                summary_text = summary_text[:last_period + 1]
+        summary_text = _finalize_summary_text(result.get("summary", ""))
         
         summary = {
             "full_text": summary_text,
             "keywords": result.get("keywords", [])
         }
+        summary = repair_summary(summary, news_item)
+        summary_text = summary["full_text"]
         
         print("--- ÖZET ---")
         print(f"Metin ({len(summary_text)} karakter): {summary_text}")
@@ -119,6 +393,158 @@ def summarize_news(news_item: Dict) -> Optional[Dict]:
         return None
 
 
+def _request_batch_summaries(news_items: List[Dict], use_cache: bool = True) -> Dict[int, Dict]:
+    """Birden fazla haberi tek istekte özetletir; index -> özet sözlüğü döner."""
+    content_budgets = allocate_token_budget(
+        [count_tokens(_news_content(item)) for item in news_items],
+        SUMMARY_BATCH_CONTENT_TOKEN_BUDGET
+    )
+    news_list = "".join(
+        f"""
+---
+[{i}] Başlık: {item.get('title', '')}
+İçerik: {_news_content(item, budget)}
+Kaynak: {item.get('source', '')}
+---
+"""
+        for i, (item, budget) in enumerate(zip(news_items, content_budgets))
+    )
+    prompt = BATCH_SUMMARY_PROMPT.format(news_list=news_list)
+    messages = [
+        {"role": "system", "content": SUMMARY_SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+    print(f"Toplu özet prompt'u: {count_message_tokens(messages)} token ({len(news_items)} haber)")
+    
+    result_text = cached_chat_completion(
+        model=SUMMARY_MODEL,
+        messages=messages,
+        temperature=0.3,
+        validate=is_json_response,
+        use_cache=use_cache,
+        response_format=json_schema_format("news_summary_batch", BATCH_SUMMARY_SCHEMA),
+        max_tokens=SUMMARY_BATCH_TOKENS_PER_ITEM * len(news_items)
+    )
+    result = _parse_json_text(result_text)
+    
+    summaries = {}
+    for entry in result.get("summaries", []):
+        index = entry.get("index")
+        if isinstance(index, int) and 0 <= index < len(news_items):
+            summaries[index] = {
+                "full_text": _finalize_summary_text(entry.get("summary", "")),
+                "keywords": entry.get("keywords", [])
+            }
+    return summaries
+
+
+def summarize_news_batch(news_items: List[Dict], max_rounds: int = SUMMARY_BATCH_MAX_ROUNDS) -> List[Optional[Dict]]:
+    """Birden fazla haberi tek istekte özetler; geçersiz özetleri tekrar ister.
+    
+    Her tur sadece doğrulamayı geçemeyen haberleri tekrar gönderir.
+    Sonuç listesi girdiyle aynı sıradadır; özetlenemeyen haberler için None.
+    """
+    results: List[Optional[Dict]] = [None] * len(news_items)
+    pending = [i for i, item in enumerate(news_items) if item]
+    
+    for round_number in range(max_rounds):
+        if not pending:
+            break
+        
+        try:
+            # İlk tur dışında cache'teki (geçersiz) yanıtı tekrar kullanma
+            summaries = _request_batch_summaries(
+                [news_items[i] for i in pending],
+                use_cache=round_number == 0
+            )
+        except Exception as e:
+            print(f"Toplu özet hatası: {type(e).__name__}: {e}")
+            summaries = {}
+        
+        failed = []
+        for local_index, item_index in enumerate(pending):
+            summary = summaries.get(local_index)
+            if summary and is_valid_summary(summary, news_items[item_index]):
+                results[item_index] = summary
+            else:
+                failed.append(item_index)
+        
+        if failed:
+            print(f"Toplu özet turu {round_number + 1}: {len(failed)} özet geçersiz, tekrar denenecek.")
+        pending = failed
+    
+    print(f"Toplu özet: {sum(1 for r in results if r)}/{len(news_items)} haber özetlendi.")
+    return results
+
+
+def write_batch_requests(news_items: List[Dict], path: str) -> str:
+    """Haberleri OpenAI Batch API JSONL formatında istek dosyasına yazar."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i, item in enumerate(news_items):
+            request = {
+                "custom_id": f"summary-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": SUMMARY_MODEL,
+                    "messages": _build_summary_messages(item),
+                    "temperature": 0.3,
+                    "max_tokens": 300
+                }
+            }
+            response_format = json_schema_format("news_summary", SUMMARY_SCHEMA)
+            if response_format:
+                request["body"]["response_format"] = response_format
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+    return path
+
+
+def run_batch_locally(requests_path: str, output_path: str) -> str:
+    """Batch istek dosyasını yerel olarak çalıştırır ve Batch API çıktı formatında yazar.
+    
+    İstekler senkron API çağrılarıyla sırayla işlenir; Batch API'nin yerel yedeğidir.
+    """
+    with open(requests_path, "r", encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as out:
+        for line in src:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            record = {"custom_id": request["custom_id"], "response": None, "error": None}
+            try:
+                response = create_chat_completion(**request["body"])
+                record["response"] = {"status_code": 200, "body": response.model_dump()}
+            except Exception as e:
+                record["error"] = {"message": str(e)}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return output_path
+
+
+def read_batch_results(output_path: str, count: int) -> List[Optional[Dict]]:
+    """Batch API çıktı dosyasını okur, geçerli özetleri sıralı liste olarak döner."""
+    results: List[Optional[Dict]] = [None] * count
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            index = int(record["custom_id"].rsplit("-", 1)[1])
+            response = record.get("response") or {}
+            if response.get("status_code") != 200 or not 0 <= index < count:
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"].strip()
+                result = _parse_json_text(content)
+            except (KeyError, IndexError, ValueError):
+                continue
+            summary = {
+                "full_text": _finalize_summary_text(result.get("summary", "")),
+                "keywords": result.get("keywords", [])
+            }
+            if is_valid_summary(summary):
+                results[index] = summary
+    return results
+
+
 if __name__ == "__main__":
     # Test
     test_news = {
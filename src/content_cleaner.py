@@ -0,0 +1,153 @@
+"""
+Content Cleaner - Haber içeriğini prompt'a girmeden önce normalize eder.
+HTML etiketlerini, script/style bloklarını, paylaşım widget'larını ve tekrar eden
+imza satırlarını temizler; entity'leri çözer ve boşlukları sadeleştirir.
+"""
+
+import re
+import html
+import hashlib
+from html.parser import HTMLParser
+from typing import Dict, List
+
+# İçeriği tamamen atlanacak etiketler
+SKIP_TAGS = {"script", "style", "noscript", "iframe", "form", "button", "svg", "nav", "aside", "footer"}
+
+# Satır sonu üreten blok etiketleri
+BLOCK_TAGS = {"p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+              "blockquote", "figcaption", "section", "article", "tr", "table"}
+
+# Boilerplate satır kalıpları (TR / EN / PL); sadece kısa satırların tamamıyla eşleşir
+_SOCIAL = r"(facebook|twitter|x|whatsapp|linkedin|telegram|e-?mail)"
+BOILERPLATE_PATTERNS = [
+    rf"(paylaş|share( on| this( article)?)?|udostępnij)\s*:?(\s*[|,/•·]?\s*{_SOCIAL})*",
+    rf"{_SOCIAL}(\s*[|,/•·]?\s*{_SOCIAL})*",
+    r"(devamını oku|haberin devamı|read more|continue reading|czytaj (więcej|dalej))\s*(»|›|→|\.\.\.|…)?",
+    r"(abone ol|subscribe( now)?|newsletter|bülten)\s*[!.:]?",
+    r"(reklam|advertisement|reklama)",
+    r"(ilgili haberler|related( articles| news)?|zobacz (też|także))\s*:?",
+]
+_BOILERPLATE_RE = re.compile(r"^(?:" + "|".join(BOILERPLATE_PATTERNS) + r")\s*$", re.IGNORECASE)
+
+# Bu uzunluktan uzun satırlar boilerplate sayılmaz (tek satırlık açıklamalar korunur)
+BOILERPLATE_MAX_LINE_LENGTH = 80
+
+# Foto/kaynak künyesi: satır atılmaz, sadece baştaki künye (ör. "Fot. PAP/...") kesilir
+_CREDIT_RE = re.compile(
+    r"^(fot\.|foto:|fotoğraf:|photo:|image:|źródło:)\s*((?:\S+\s+){0,3}?\S*/\S+|\S+)\s*",
+    re.IGNORECASE
+)
+
+# WordPress feed imzası: satır sonundan kesilir
+_APPEARED_FIRST_RE = re.compile(r"\s*the post .+? appeared first on .+?\.?$", re.IGNORECASE)
+
+# Temizlenmiş içerik cache'i (ham içerik hash'i -> temiz metin)
+_clean_cache: Dict[str, str] = {}
+
+
+class _TextExtractor(HTMLParser):
+    """HTML'den görünür metni satır yapısını koruyarak çıkarır."""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+    
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append("\n")
+    
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+    
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def _strip_markup(raw: str) -> str:
+    """HTML etiketlerini kaldırır; entity'leri çözer."""
+    if "<" not in raw:
+        return html.unescape(raw)
+    
+    extractor = _TextExtractor()
+    try:
+        extractor.feed(raw)
+        extractor.close()
+    except Exception:
+        return html.unescape(re.sub(r"<[^>]+>", " ", raw))
+    # Çift kodlanmış entity'ler için (ör. &amp;quot;)
+    return html.unescape("".join(extractor.parts))
+
+
+def _strip_credit(line: str) -> str:
+    """Satır başındaki foto/kaynak künyesini keser, metnin geri kalanını korur."""
+    match = _CREDIT_RE.match(line)
+    if not match:
+        return line
+    
+    rest = line[match.end():]
+    # "PAP/Leszek Szymański" gibi ajans/ad soyad künyelerinde soyadı da künyeye dahildir
+    credit = match.group(2)
+    words = rest.split(" ", 1)
+    if "/" in credit and credit.rsplit("/", 1)[-1].istitle() and len(words) == 2 and words[0].istitle():
+        rest = words[1]
+    return rest
+
+
+def _clean_text(raw: str) -> str:
+    """Markup, boilerplate ve tekrar eden satırları temizler, boşlukları sadeleştirir."""
+    text = _strip_markup(raw)
+    
+    lines = []
+    seen = set()
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        line = _strip_credit(_APPEARED_FIRST_RE.sub("", line))
+        if not line or (len(line) <= BOILERPLATE_MAX_LINE_LENGTH and _BOILERPLATE_RE.match(line)):
+            continue
+        # Tekrar eden imza/byline satırları
+        key = line.casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    
+    return " ".join(lines)
+
+
+def clean_content(raw: str) -> str:
+    """İçeriği temizler; sonuç ham içerik hash'ine göre cache'lenir."""
+    if not raw:
+        return ""
+    
+    content_hash = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    cleaned = _clean_cache.get(content_hash)
+    if cleaned is None:
+        cleaned = _clean_text(raw)
+        _clean_cache[content_hash] = cleaned
+    return cleaned
+
+
+def normalize_item(item: Dict) -> Dict:
+    """Habere 'clean_content' alanını ekler (zaten varsa dokunmaz)."""
+    if 'clean_content' not in item:
+        raw = item.get('content') or item.get('description', '')
+        item['clean_content'] = clean_content(raw)
+    return item
+
+
+def normalize_items(news_items: List[Dict]) -> List[Dict]:
+    """Haber listesindeki her habere 'clean_content' ekler."""
+    for item in news_items:
+        normalize_item(item)
+    return news_items
@@ -0,0 +1,127 @@
+"""
+History Index - Paylaşılan özetlerin hashlenmiş kelime torbası vektörlerini tutar.
+Yeni adayların son günlerde paylaşılan konulara benzerliği NumPy ile vektörel
+kosinüs benzerliği olarak hesaplanır.
+"""
+
+import os
+import re
+import time
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+HISTORY_INDEX_PATH = os.getenv("HISTORY_INDEX_PATH", ".cache/history_index.npz")
+
+# Vektör boyutu (hashing trick); diskte float16 saklanır
+HISTORY_DIM = 512
+
+# Benzerlik kontrolünde bakılacak gün sayısı ve eşik
+HISTORY_LOOKBACK_DAYS = int(os.getenv("HISTORY_LOOKBACK_DAYS", "3"))
+HISTORY_SIMILARITY_THRESHOLD = float(os.getenv("HISTORY_SIMILARITY_THRESHOLD", "0.6"))
+
+# Bu süreden eski kayıtlar kaydetme sırasında silinir
+HISTORY_RETENTION_DAYS = 90
+
+# Kelime kökü olarak kullanılacak ön ek uzunluğu
+STEM_LENGTH = 6
+
+# Bellekteki indeks: (vektörler, timestamp'ler, başlıklar)
+_index: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+
+def _tokens(text: str) -> List[str]:
+    """Metni küçük harfli köklere böler."""
+    text = re.sub(r"<[^>]+>", " ", text or "")
+    text = text.replace("I", "ı").replace("İ", "i").lower()
+    return [token[:STEM_LENGTH] for token in re.findall(r"\w+", text) if len(token) > 2]
+
+
+def vectorize(texts: List[str]) -> np.ndarray:
+    """Metinleri L2-normalize hashlenmiş kelime torbası vektörlerine çevirir."""
+    matrix = np.zeros((len(texts), HISTORY_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in _tokens(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            # İşaretli hashing, çakışan kelimelerin birbirini şişirmesini engeller
+            matrix[row, h % HISTORY_DIM] += 1.0 if (h >> 31) & 1 else -1.0
+    
+    # Sık tekrar eden kelimeler baskın olmasın
+    matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _empty_index() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Boş indeks döner."""
+    return (
+        np.zeros((0, HISTORY_DIM), dtype=np.float16),
+        np.zeros(0, dtype=np.float64),
+        np.zeros(0, dtype=str)
+    )
+
+
+def load_index() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """İndeksi diskten bir kez yükler ve bellekte tutar."""
+    global _index
+    if _index is not None:
+        return _index
+    
+    _index = _empty_index()
+    if os.path.exists(HISTORY_INDEX_PATH):
+        try:
+            with np.load(HISTORY_INDEX_PATH) as data:
+                if data["vectors"].shape[1] == HISTORY_DIM:
+                    _index = (data["vectors"], data["timestamps"], data["titles"])
+        except Exception as e:
+            print(f"Geçmiş indeksi okunamadı: {e}")
+    return _index
+
+
+def _save_index(vectors: np.ndarray, timestamps: np.ndarray, titles: np.ndarray) -> None:
+    """İndeksi diske atomik olarak yazar."""
+    index_dir = os.path.dirname(HISTORY_INDEX_PATH)
+    if index_dir:
+        os.makedirs(index_dir, exist_ok=True)
+    
+    tmp_path = f"{HISTORY_INDEX_PATH}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, vectors=vectors, timestamps=timestamps, titles=titles)
+    os.replace(tmp_path, HISTORY_INDEX_PATH)
+
+
+def add_posted(summary_text: str, title: str = "", posted_at: Optional[float] = None) -> None:
+    """Paylaşılan özeti indekse ekler; saklama süresini aşan kayıtları atar."""
+    global _index
+    vectors, timestamps, titles = load_index()
+    now = posted_at if posted_at is not None else time.time()
+    
+    keep = timestamps >= now - HISTORY_RETENTION_DAYS * 86400
+    new_vector = vectorize([f"{title} {summary_text}"]).astype(np.float16)
+    
+    vectors = np.vstack([vectors[keep], new_vector])
+    timestamps = np.append(timestamps[keep], now)
+    titles = np.append(titles[keep], title)
+    _index = (vectors, timestamps, titles)
+    
+    try:
+        _save_index(vectors, timestamps, titles)
+    except Exception as e:
+        print(f"Geçmiş indeksi yazılamadı: {e}")
+
+
+def max_similarity(texts: List[str], days: int = HISTORY_LOOKBACK_DAYS) -> np.ndarray:
+    """Her metnin son N günde paylaşılanlarla en yüksek kosinüs benzerliğini döner."""
+    if not texts:
+        return np.zeros(0, dtype=np.float32)
+    
+    vectors, timestamps, _ = load_index()
+    recent = timestamps >= time.time() - days * 86400
+    if not recent.any():
+        return np.zeros(len(texts), dtype=np.float32)
+    
+    queries = vectorize(texts)
+    similarities = queries @ vectors[recent].astype(np.float32).T
+    return similarities.max(axis=1)
@@ -0,0 +1,153 @@
+"""
+Image Cache - Görsel arama sonuçlarını ve indirilen görselleri diskte saklar.
+(sağlayıcı, sorgu) -> URL eşlemesi TTL ile, URL -> görsel baytları SHA-256
+adresli dosyalar olarak tutulur. Boyut sınırı aşılınca en eski kullanılanlar silinir.
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+from contextlib import closing
+from typing import Optional
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", ".cache/images")
+IMAGE_SEARCH_CACHE_TTL = int(os.getenv("IMAGE_SEARCH_CACHE_TTL", str(24 * 3600)))  # saniye
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+
+def _connect() -> sqlite3.Connection:
+    """İndeks veritabanına bağlanır ve tabloları gerekirse oluşturur."""
+    os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(IMAGE_CACHE_DIR, "index.sqlite3"))
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_results (
+                provider TEXT NOT NULL,
+                query TEXT NOT NULL,
+                url TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (provider, query)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS downloads (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def _blob_path(sha256: str) -> str:
+    """SHA-256 için blob dosya yolunu döner."""
+    return os.path.join(IMAGE_CACHE_DIR, "blobs", sha256[:2], sha256)
+
+
+def _atomic_copy(src_path: str, dst_path: str) -> None:
+    """Dosyayı hedef klasörde geçici dosya üzerinden atomik olarak kopyalar."""
+    dst_dir = os.path.dirname(dst_path) or "."
+    os.makedirs(dst_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dst_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as dst, open(src_path, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, dst_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def get_cached_search(provider: str, query: str) -> Optional[str]:
+    """Süresi dolmamış arama sonucunu döner."""
+    try:
+        with closing(_connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT url, created_at FROM search_results WHERE provider = ? AND query = ?",
+                (provider, query)
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Görsel cache okunamadı: {e}")
+        return None
+    
+    if row and time.time() - row[1] <= IMAGE_SEARCH_CACHE_TTL:
+        return row[0]
+    return None
+
+
+def store_search(provider: str, query: str, url: str) -> None:
+    """Arama sonucunu saklar."""
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_results (provider, query, url, created_at) VALUES (?, ?, ?, ?)",
+                (provider, query, url, time.time())
+            )
+    except sqlite3.Error as e:
+        print(f"Görsel cache yazılamadı: {e}")
+
+
+def copy_cached_image(url: str, output_path: str) -> bool:
+    """URL daha önce indirildiyse görseli cache'ten output_path'e kopyalar."""
+    try:
+        with closing(_connect()) as conn, conn:
+            row = conn.execute("SELECT sha256 FROM downloads WHERE url = ?", (url,)).fetchone()
+            if row and os.path.exists(_blob_path(row[0])):
+                conn.execute("UPDATE downloads SET last_access = ? WHERE url = ?", (time.time(), url))
+        
+        if not row or not os.path.exists(_blob_path(row[0])):
+            return False
+        _atomic_copy(_blob_path(row[0]), output_path)
+        return True
+    except (sqlite3.Error, OSError) as e:
+        print(f"Görsel cache okunamadı: {e}")
+        return False
+
+
+def store_image_file(url: str, path: str) -> None:
+    """İndirilen görsel dosyasını içerik hash'iyle saklar ve boyut sınırını uygular."""
+    try:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                hasher.update(chunk)
+        sha256 = hasher.hexdigest()
+        
+        blob_path = _blob_path(sha256)
+        if not os.path.exists(blob_path):
+            _atomic_copy(path, blob_path)
+        
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO downloads (url, sha256, size, last_access) VALUES (?, ?, ?, ?)",
+                (url, sha256, os.path.getsize(blob_path), time.time())
+            )
+            _evict(conn)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Görsel cache yazılamadı: {e}")
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    """Blob toplam boyutu sınırı aşarsa en eski kullanılan görselleri (LRU) siler."""
+    blobs = conn.execute(
+        "SELECT sha256, MAX(size), MAX(last_access) FROM downloads GROUP BY sha256 ORDER BY MAX(last_access) ASC"
+    ).fetchall()
+    total_size = sum(size for _, size, _ in blobs)
+    
+    for sha256, size, _ in blobs:
+        if total_size <= IMAGE_CACHE_MAX_BYTES:
+            break
+        conn.execute("DELETE FROM downloads WHERE sha256 = ?", (sha256,))
+        try:
+            os.remove(_blob_path(sha256))
+        except FileNotFoundError:
+            pass
+        total_size -= size
@@ -5,9 +5,15 @@ SF Pro Medium font, -0.5 letter spacing.
 Metin ayırıcı çizgiden hizalı (bottom-aligned).
 """
 
+import io
 import os
-from PIL import Image, ImageDraw, ImageFont
-from typing import Optional, List
+import math
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+from typing import Dict, Optional, List, Tuple, Any
 
 # Sabit değerler (template'e göre)
 CANVAS_SIZE = (1080, 1080)
@@ -54,10 +60,65 @@ DIVIDER_END = 350
 
 FOOTER_Y = 855
 FOOTER_FONT_SIZE = 22
+FOOTER_LINE_HEIGHT = 28
+FOOTER_LINES = [
+    "Daha fazlası için Google Play veya App Store'dan",
+    "Gurbetci SuperApp'i ücretsiz indir."
+]
+
+# Kerning çiftlerini metin genişliğine kat (kapalıyken çıktı eskisiyle birebir aynı)
+TEXT_KERNING = os.getenv("TEXT_KERNING", "0").lower() in ("1", "true", "yes")
+
+# (font yolu, boyut) -> karakter -> genişlik
+_glyph_widths: Dict[Tuple, Dict[str, float]] = {}
+
+# (font yolu, boyut) -> karakter çifti -> kerning düzeltmesi
+_kerning_pairs: Dict[Tuple, Dict[str, float]] = {}
+
+# Metni glif atlası ile çiz (kapalıysa her karakter için ayrı draw.text çağrısı)
+TEXT_GLYPH_ATLAS = os.getenv("TEXT_GLYPH_ATLAS", "1").lower() in ("1", "true", "yes")
+
+# Atlas maskelerinin kenar boşluğu (piksel)
+GLYPH_PADDING = 2
+
+# (font yolu, boyut, karakter, x kesri, y kesri) -> (alfa maskesi, maske içindeki orijin)
+_glyph_atlas: Dict[Tuple, Tuple[Image.Image, Tuple[int, int]]] = {}
+
+# Çıktı formatı: png (optimize), jpeg (progressive) veya webp.
+# Instagram Graph API yalnızca JPEG'i resmi olarak destekler; webp sadece kabul eden hosting'ler için.
+POST_IMAGE_FORMAT = os.getenv("POST_IMAGE_FORMAT", "png").lower()
+
+# JPEG/WebP kalite araması için hedef dosya boyutu (bayt) ve kalite aralığı
+POST_IMAGE_TARGET_BYTES = int(os.getenv("POST_IMAGE_TARGET_BYTES", str(400 * 1024)))
+POST_IMAGE_QUALITY_RANGE = (60, 95)
 
+# PNG optimize (çok daha yavaş, dosya ancak birkaç yüzde küçülür)
+POST_IMAGE_PNG_OPTIMIZE = os.getenv("POST_IMAGE_PNG_OPTIMIZE", "0").lower() in ("1", "true", "yes")
 
+# Format -> (Pillow formatı, dosya uzantısı)
+POST_IMAGE_FORMATS = {
+    "png": ("PNG", ".png"),
+    "jpeg": ("JPEG", ".jpg"),
+    "jpg": ("JPEG", ".jpg"),
+    "webp": ("WEBP", ".webp"),
+}
+
+# Toplu üretimde kullanılacak süreç sayısı (varsayılan: CPU sayısı)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+
+# Statik katmanların (arka plan, bayrak, çizgi, alt yazı, ikon) disk kopyası; boşsa sadece bellekte
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", ".cache/templates")
+
+# Şablon anahtarı -> hazır taban canvas
+_template_cache: Dict[str, Image.Image] = {}
+
+# (yol, mtime, boyut) -> içerik hash'i
+_asset_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+@lru_cache(maxsize=None)
 def get_font(size: int) -> ImageFont.FreeTypeFont:
-    """SF Pro Medium fontunu yükler, yoksa fallback kullanır."""
+    """SF Pro Medium fontunu yükler, yoksa fallback kullanır (boyut başına bir kez)."""
     # Önce repo'daki fontu dene
     if os.path.exists(FONT_PATH):
         try:
@@ -81,18 +142,118 @@ def get_font(size: int) -> ImageFont.FreeTypeFont:
     return ImageFont.load_default()
 
 
+def _font_key(font: ImageFont.FreeTypeFont) -> Tuple:
+    """Font için (yol, boyut) anahtarı döner."""
+    return (getattr(font, "path", None) or id(font), getattr(font, "size", 0))
+
+
+def glyph_width(font: ImageFont.FreeTypeFont, char: str) -> float:
+    """Karakterin bbox genişliğini font ve boyut başına bir kez ölçer."""
+    widths = _glyph_widths.setdefault(_font_key(font), {})
+    width = widths.get(char)
+    if width is None:
+        bbox = font.getbbox(char)
+        width = widths[char] = bbox[2] - bbox[0]
+    return width
+
+
+def kerning_adjustment(font: ImageFont.FreeTypeFont, left: str, right: str) -> float:
+    """İki karakter arasındaki kerning düzeltmesini döner (TEXT_KERNING kapalıysa 0)."""
+    if not TEXT_KERNING or not hasattr(font, "getlength"):
+        return 0
+    
+    pairs = _kerning_pairs.setdefault(_font_key(font), {})
+    pair = left + right
+    adjustment = pairs.get(pair)
+    if adjustment is None:
+        adjustment = pairs[pair] = font.getlength(pair) - font.getlength(left) - font.getlength(right)
+    return adjustment
+
+
+def glyph_mask(font: ImageFont.FreeTypeFont, char: str, frac_x: float, frac_y: float = 0.0) -> Tuple[Image.Image, Tuple[int, int]]:
+    """
+    Karakterin alfa maskesini (font, boyut, karakter, alt piksel konumu) başına bir kez çizer.
+    draw.text ile aynı rasterizasyonu kullanır; maske orijini ile birlikte döner.
+    """
+    key = _font_key(font) + (char, frac_x, frac_y)
+    cached = _glyph_atlas.get(key)
+    if cached is not None:
+        return cached
+    
+    left, top, right, bottom = font.getbbox(char)
+    origin = (GLYPH_PADDING - min(left, 0), GLYPH_PADDING - min(top, 0))
+    size = (origin[0] + max(right, 0) + GLYPH_PADDING + 1, origin[1] + max(bottom, 0) + GLYPH_PADDING + 1)
+    
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).text((origin[0] + frac_x, origin[1] + frac_y), char, font=font, fill=255)
+    
+    _glyph_atlas[key] = (mask, origin)
+    return _glyph_atlas[key]
+
+
+def _draw_text_atlas(draw: ImageDraw.Draw, pos: tuple, text: str, font: ImageFont.FreeTypeFont,
+                     fill: tuple, letter_spacing: float) -> float:
+    """
+    Satırı atlas maskelerinden tek bir satır maskesinde birleştirir (screen) ve tek seferde boyar.
+    Aynı renkte üst üste binen glifler için sıralı draw.text ile aynı sonucu verir.
+    """
+    x, y = pos
+    total_width = 0
+    previous = None
+    placements = []
+    
+    for char in text:
+        if previous is not None:
+            kerning = kerning_adjustment(font, previous, char)
+            x += kerning
+            total_width += kerning
+        # draw.text ile aynı: tam sayı kısım konum, kesir kısım rasterizasyon başlangıcı
+        frac_x, frac_y = math.modf(x)[0], math.modf(y)[0]
+        mask, origin = glyph_mask(font, char, frac_x, frac_y)
+        placements.append((int(x) - origin[0], int(y) - origin[1], mask))
+        
+        char_width = glyph_width(font, char)
+        x += char_width + letter_spacing
+        total_width += char_width + letter_spacing
+        previous = char
+    
+    if not placements:
+        return total_width
+    
+    min_x = min(px for px, _, _ in placements)
+    min_y = min(py for _, py, _ in placements)
+    max_x = max(px + mask.width for px, _, mask in placements)
+    max_y = max(py + mask.height for _, py, mask in placements)
+    
+    line_mask = Image.new('L', (max_x - min_x, max_y - min_y), 0)
+    for px, py, mask in placements:
+        box = (px - min_x, py - min_y, px - min_x + mask.width, py - min_y + mask.height)
+        line_mask.paste(ImageChops.screen(line_mask.crop(box), mask), box)
+    
+    draw.bitmap((min_x, min_y), line_mask, fill=fill)
+    return total_width
+
+
 def draw_text_with_spacing(draw: ImageDraw.Draw, pos: tuple, text: str, font: ImageFont.FreeTypeFont, 
                            fill: tuple, letter_spacing: float = LETTER_SPACING) -> float:
     """Letter spacing ile metin çizer. Satır genişliğini döndürür."""
+    if TEXT_GLYPH_ATLAS:
+        return _draw_text_atlas(draw, pos, text, font, fill, letter_spacing)
+    
     x, y = pos
     total_width = 0
+    previous = None
     
     for char in text:
+        if previous is not None:
+            kerning = kerning_adjustment(font, previous, char)
+            x += kerning
+            total_width += kerning
         draw.text((x, y), char, font=font, fill=fill)
-        bbox = font.getbbox(char)
-        char_width = bbox[2] - bbox[0]
+        char_width = glyph_width(font, char)
         x += char_width + letter_spacing
         total_width += char_width + letter_spacing
+        previous = char
     
     return total_width
 
@@ -100,30 +261,45 @@ def draw_text_with_spacing(draw: ImageDraw.Draw, pos: tuple, text: str, font: Im
 def get_text_width_with_spacing(text: str, font: ImageFont.FreeTypeFont, letter_spacing: float = LETTER_SPACING) -> float:
     """Letter spacing ile metin genişliğini hesaplar."""
     total_width = 0
+    previous = None
     for char in text:
-        bbox = font.getbbox(char)
-        char_width = bbox[2] - bbox[0]
-        total_width += char_width + letter_spacing
+        if previous is not None:
+            total_width += kerning_adjustment(font, previous, char)
+        total_width += glyph_width(font, char) + letter_spacing
+        previous = char
     return total_width - letter_spacing if total_width > 0 else 0
 
 
 def wrap_text_with_spacing(text: str, font: ImageFont.FreeTypeFont, max_width: float, 
                            letter_spacing: float = LETTER_SPACING) -> List[str]:
-    """Letter spacing ile metni satırlara böler."""
+    """
+    Letter spacing ile metni satırlara böler.
+    Satır genişliği her kelimede baştan ölçülmez; kelime genişliği ve
+    aradaki boşluk mevcut genişliğe eklenir (doğrusal zaman).
+    """
     words = text.split()
     lines = []
     current_line = ""
+    current_width = 0
+    space_width = glyph_width(font, " ")
     
     for word in words:
-        test_line = f"{current_line} {word}".strip() if current_line else word
-        width = get_text_width_with_spacing(test_line, font, letter_spacing)
+        word_width = get_text_width_with_spacing(word, font, letter_spacing)
+        if current_line:
+            width = (current_width + letter_spacing + space_width + letter_spacing + word_width
+                     + kerning_adjustment(font, current_line[-1], " ")
+                     + kerning_adjustment(font, " ", word[0]))
+        else:
+            width = word_width
         
         if width <= max_width:
-            current_line = test_line
+            current_line = f"{current_line} {word}" if current_line else word
+            current_width = width
         else:
             if current_line:
                 lines.append(current_line)
             current_line = word
+            current_width = word_width
     
     if current_line:
         lines.append(current_line)
@@ -146,17 +322,64 @@ def add_rounded_corners(image: Image.Image, radius: int) -> Image.Image:
     return output
 
 
-def generate_instagram_post(
-    news_text: str,
-    news_image_path: str,
-    output_path: str = "output/post.png"
-) -> Optional[str]:
-    """Instagram postu oluşturur."""
+def load_cover_image(source, size: tuple) -> Image.Image:
+    """
+    Görseli hedef boyutu kaplayacak şekilde açar, ölçekler ve ortadan kırpar.
+    JPEG'ler draft modunda, hedefi hâlâ kaplayan en küçük ölçekte çözülür.
+    """
+    img = Image.open(source)
     
-    # Output klasörünü oluştur
-    os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else "output", exist_ok=True)
+    img_ratio = img.width / img.height
+    target_ratio = size[0] / size[1]
+    
+    if img_ratio > target_ratio:
+        new_height = size[1]
+        new_width = int(new_height * img_ratio)
+    else:
+        new_width = size[0]
+        new_height = int(new_width / img_ratio)
+    
+    # JPEG: 1/2, 1/4, 1/8 ölçekli çözme (hedefin altına inmez)
+    if img.format == 'JPEG':
+        img.draft('RGB', (new_width, new_height))
+    
+    img = img.convert('RGBA')
+    # reducing_gap: önce tam sayı oranında hızlı küçültme, sonra LANCZOS
+    img = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=3.0)
     
-    # 1. Arka planı yükle
+    left = (new_width - size[0]) // 2
+    top = (new_height - size[1]) // 2
+    return img.crop((left, top, left + size[0], top + size[1]))
+
+
+def _asset_hash(path: str) -> str:
+    """Asset dosyasının içerik hash'ini döner; mtime ve boyut değişmedikçe dosyayı tekrar okumaz."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    
+    signature = (path, stat.st_mtime_ns, stat.st_size)
+    if signature not in _asset_hashes:
+        with open(path, 'rb') as f:
+            _asset_hashes[signature] = hashlib.sha256(f.read()).hexdigest()
+    return _asset_hashes[signature]
+
+
+def _template_key() -> str:
+    """Statik katmanları etkileyen asset'ler ve yerleşim sabitlerinden şablon anahtarı üretir."""
+    font_path = getattr(get_font(FOOTER_FONT_SIZE), "path", "default")
+    parts = [_asset_hash(path) for path in (BACKGROUND_PATH, FLAG_PATH, ICON_PATH, font_path)]
+    parts.append(repr((
+        CANVAS_SIZE, FLAG_POSITION, FLAG_SIZE, ICON_POSITION, ICON_SIZE,
+        DIVIDER_START, DIVIDER_END, DIVIDER_Y, FOOTER_Y, FOOTER_FONT_SIZE,
+        FOOTER_LINE_HEIGHT, FOOTER_LINES, LETTER_SPACING, TEXT_KERNING
+    )))
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _render_template() -> Image.Image:
+    """Arka plan, bayrak, ayırıcı çizgi, alt yazı ve ikonu tek bir taban canvas'a çizer."""
     try:
         background = Image.open(BACKGROUND_PATH).convert('RGBA')
         background = background.resize(CANVAS_SIZE, Image.Resampling.LANCZOS)
@@ -167,7 +390,7 @@ def generate_instagram_post(
     canvas = background.copy()
     draw = ImageDraw.Draw(canvas)
     
-    # 2. Bayrağı ekle (sağ üst)
+    # Bayrak (sağ üst)
     try:
         flag = Image.open(FLAG_PATH).convert('RGBA')
         flag = flag.resize(FLAG_SIZE, Image.Resampling.LANCZOS)
@@ -175,26 +398,148 @@ def generate_instagram_post(
     except Exception as e:
         print(f"Bayrak yüklenemedi: {e}")
     
-    # 3. Haber görselini ekle (ortada, rounded)
+    # Ayırıcı çizgi
+    draw.line([(DIVIDER_START, DIVIDER_Y), (DIVIDER_END, DIVIDER_Y)], fill=(255, 255, 255, 120), width=2)
+    
+    # Alt yazı (sabit metin)
+    footer_font = get_font(FOOTER_FONT_SIZE)
+    footer_y = FOOTER_Y
+    for line in FOOTER_LINES:
+        draw_text_with_spacing(draw, (DIVIDER_START, footer_y), line, footer_font, (170, 170, 170, 255), LETTER_SPACING)
+        footer_y += FOOTER_LINE_HEIGHT
+    
+    # İkon (sağ alt)
     try:
-        news_img = Image.open(news_image_path).convert('RGBA')
-        
-        img_ratio = news_img.width / news_img.height
-        target_ratio = NEWS_IMAGE_SIZE[0] / NEWS_IMAGE_SIZE[1]
-        
-        if img_ratio > target_ratio:
-            new_height = NEWS_IMAGE_SIZE[1]
-            new_width = int(new_height * img_ratio)
+        icon = Image.open(ICON_PATH).convert('RGBA')
+        icon = icon.resize(ICON_SIZE, Image.Resampling.LANCZOS)
+        canvas.paste(icon, ICON_POSITION, icon)
+    except Exception as e:
+        print(f"İkon yüklenemedi: {e}")
+    
+    return canvas
+
+
+def get_template() -> Image.Image:
+    """
+    Statik katmanlardan oluşan taban canvas'ı döner.
+    Önce bellekteki, sonra diskteki kopyaya bakar; asset'ler değişince yeniden çizilir.
+    Dönen görsel paylaşımlıdır, üzerine çizmeden önce kopyalanmalıdır.
+    """
+    key = _template_key()
+    if key in _template_cache:
+        return _template_cache[key]
+    
+    disk_path = os.path.join(TEMPLATE_CACHE_DIR, f"template_{key}.png") if TEMPLATE_CACHE_DIR else None
+    template = None
+    if disk_path and os.path.exists(disk_path):
+        try:
+            template = Image.open(disk_path).convert('RGBA')
+        except Exception as e:
+            print(f"Şablon cache'i okunamadı: {e}")
+    
+    if template is None:
+        template = _render_template()
+        if disk_path:
+            try:
+                os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+                tmp_path = f"{disk_path}.{os.getpid()}.tmp"
+                template.save(tmp_path, 'PNG')
+                os.replace(tmp_path, disk_path)
+            except Exception as e:
+                print(f"Şablon cache'i yazılamadı: {e}")
+    
+    _template_cache.clear()
+    _template_cache[key] = template
+    return template
+
+
+def _encode(image: Image.Image, pil_format: str, quality: Optional[int] = None) -> bytes:
+    """Görseli bellekte verilen formatta kodlar."""
+    buffer = io.BytesIO()
+    if pil_format == "PNG":
+        image.save(buffer, "PNG", optimize=POST_IMAGE_PNG_OPTIMIZE)
+    elif pil_format == "JPEG":
+        image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True, subsampling="4:2:0")
+    else:
+        image.save(buffer, "WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def encode_post_image(
+    image: Image.Image,
+    output_path: str,
+    image_format: Optional[str] = None,
+    target_bytes: Optional[int] = None
+) -> str:
+    """
+    Postu seçilen formatta kaydeder; dosya uzantısı formata göre düzeltilir.
+    JPEG ve WebP için hedef boyutu aşmayan en yüksek kalite ikili arama ile bulunur.
+    Kaydedilen dosyanın yolunu döner.
+    """
+    image_format = (image_format or POST_IMAGE_FORMAT).lower()
+    if image_format not in POST_IMAGE_FORMATS:
+        print(f"⚠️ Bilinmeyen görsel formatı '{image_format}', png kullanılıyor")
+        image_format = "png"
+    pil_format, extension = POST_IMAGE_FORMATS[image_format]
+    target_bytes = target_bytes or POST_IMAGE_TARGET_BYTES
+    
+    start = time.perf_counter()
+    image = image.convert('RGB')
+    
+    quality = None
+    if pil_format == "PNG":
+        data = _encode(image, pil_format)
+    else:
+        low, high = POST_IMAGE_QUALITY_RANGE
+        data = None
+        # Çoğu post en yüksek kalitede hedefe sığar; aramaya ondan önce bak
+        candidate = _encode(image, pil_format, high)
+        if len(candidate) <= target_bytes:
+            quality, data = high, candidate
+            low = high + 1
         else:
-            new_width = NEWS_IMAGE_SIZE[0]
-            new_height = int(new_width / img_ratio)
-        
-        news_img = news_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        left = (new_width - NEWS_IMAGE_SIZE[0]) // 2
-        top = (new_height - NEWS_IMAGE_SIZE[1]) // 2
-        news_img = news_img.crop((left, top, left + NEWS_IMAGE_SIZE[0], top + NEWS_IMAGE_SIZE[1]))
+            high -= 1
+        while low <= high:
+            mid = (low + high) // 2
+            candidate = _encode(image, pil_format, mid)
+            if len(candidate) <= target_bytes:
+                quality, data = mid, candidate
+                low = mid + 1
+            else:
+                high = mid - 1
         
+        # Hiçbir kalite hedefe sığmadıysa en düşük kaliteyi kullan
+        if data is None:
+            quality = POST_IMAGE_QUALITY_RANGE[0]
+            data = _encode(image, pil_format, quality)
+    
+    output_path = os.path.splitext(output_path)[0] + extension
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    quality_text = f", kalite {quality}" if quality is not None else ""
+    print(f"Görsel kodlandı: {image_format} {len(data)} bayt{quality_text}, {elapsed_ms:.0f} ms")
+    return output_path
+
+
+def generate_instagram_post(
+    news_text: str,
+    news_image_path: str,
+    output_path: str = "output/post.png"
+) -> Optional[str]:
+    """Instagram postu oluşturur."""
+    
+    # Output klasörünü oluştur
+    os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else "output", exist_ok=True)
+    
+    # 1-2. Statik katmanlar (arka plan, bayrak, çizgi, alt yazı, ikon) cache'ten
+    canvas = get_template().copy()
+    draw = ImageDraw.Draw(canvas)
+    
+    # 3. Haber görselini ekle (ortada, rounded)
+    try:
+        news_img = load_cover_image(news_image_path, NEWS_IMAGE_SIZE)
         news_img = add_rounded_corners(news_img, NEWS_IMAGE_RADIUS)
         canvas.paste(news_img, NEWS_IMAGE_POSITION, news_img)
     except Exception as e:
@@ -221,35 +566,70 @@ def generate_instagram_post(
         draw_text_with_spacing(draw, (TEXT_LEFT_X, y), line, font, (255, 255, 255, 255), LETTER_SPACING)
         y += TEXT_LINE_HEIGHT
     
-    # 5. Ayırıcı çizgi
-    draw.line([(DIVIDER_START, DIVIDER_Y), (DIVIDER_END, DIVIDER_Y)], fill=(255, 255, 255, 120), width=2)
-    
-    # 6. Alt yazı (sabit metin)
-    footer_font = get_font(FOOTER_FONT_SIZE)
-    footer_lines = [
-        "Daha fazlası için Google Play veya App Store'dan",
-        "Gurbetci SuperApp'i ücretsiz indir."
-    ]
+    # 5. Kaydet (POST_IMAGE_FORMAT'a göre png/jpeg/webp)
+    output_path = encode_post_image(canvas, output_path)
     
-    footer_y = FOOTER_Y
-    for line in footer_lines:
-        draw_text_with_spacing(draw, (DIVIDER_START, footer_y), line, footer_font, (170, 170, 170, 255), LETTER_SPACING)
-        footer_y += 28
-    
-    # 7. İkonu ekle (sağ alt)
+    print(f"✅ Instagram postu oluşturuldu: {output_path}")
+    return output_path
+
+
+def _warm_renderer() -> None:
+    """Şablonu ve fontları önceden yükler (her worker sürecinde bir kez)."""
+    get_template()
+    get_font(TEXT_FONT_SIZE)
+    get_font(FOOTER_FONT_SIZE)
+
+
+def _render_job(job: Tuple[str, str, str]) -> Dict[str, Any]:
+    """Tek bir post üretir ve süresini ölçer."""
+    news_text, news_image_path, output_path = job
+    start = time.perf_counter()
     try:
-        icon = Image.open(ICON_PATH).convert('RGBA')
-        icon = icon.resize(ICON_SIZE, Image.Resampling.LANCZOS)
-        canvas.paste(icon, ICON_POSITION, icon)
+        result = generate_instagram_post(news_text, news_image_path, output_path)
+        error = None
     except Exception as e:
-        print(f"İkon yüklenemedi: {e}")
+        result = None
+        error = str(e)
     
-    # 8. Kaydet
-    canvas = canvas.convert('RGB')
-    canvas.save(output_path, 'PNG', quality=95)
+    return {
+        "output_path": result,
+        "seconds": time.perf_counter() - start,
+        "error": error
+    }
+
+
+def render_posts_batch(
+    jobs: List[Tuple[str, str, str]],
+    workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Birden fazla postu (metin, haber görseli, çıktı yolu) süreç havuzunda üretir.
+    Her worker şablonu, fontları ve asset'leri bir kez yükler.
+    Sonuçlar iş sırasıyla döner: output_path (hata varsa None), seconds, error.
+    """
+    if not jobs:
+        return []
     
-    print(f"✅ Instagram postu oluşturuldu: {output_path}")
-    return output_path
+    workers = max(1, min(workers or RENDER_WORKERS, len(jobs)))
+    start = time.perf_counter()
+    
+    # Şablonun disk kopyası worker'lardan önce hazır olsun
+    _warm_renderer()
+    
+    if workers == 1:
+        results = [_render_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_renderer) as executor:
+            results = list(executor.map(_render_job, jobs))
+    
+    elapsed = time.perf_counter() - start
+    for job, result in zip(jobs, results):
+        status = "✅" if result["output_path"] else f"❌ {result['error'] or 'üretilemedi'}"
+        print(f"  {job[2]}: {result['seconds'] * 1000:.0f} ms {status}")
+    
+    print(f"{len(jobs)} post {workers} süreçte {elapsed:.2f} sn'de üretildi "
+          f"({len(jobs) / elapsed:.1f} post/sn)")
+    return results
 
 
 if __name__ == "__main__":
@@ -4,19 +4,147 @@ Unsplash API veya Google Custom Search API kullanır.
 """
 
 import os
+import math
+import time
 import requests
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
 import re
 
+from image_generator import NEWS_IMAGE_SIZE
+from image_cache import get_cached_search, store_search, copy_cached_image, store_image_file
+
 # Unsplash API (ücretsiz, attribution gerekli)
 UNSPLASH_ACCESS_KEY = os.getenv("UNSPLASH_ACCESS_KEY", "")
 
 # Pexels API (alternatif, ücretsiz)
 PEXELS_API_KEY = os.getenv("PEXELS_API_KEY", "")
 
+# Sağlayıcı başına arama süresi sınırı (saniye)
+IMAGE_SEARCH_TIMEOUT = float(os.getenv("IMAGE_SEARCH_TIMEOUT", "8"))
+
+# Sağlayıcıları paralel sorgula (kapalıysa sırayla)
+IMAGE_SEARCH_CONCURRENT = os.getenv("IMAGE_SEARCH_CONCURRENT", "1").lower() in ("1", "true", "yes")
+
+# Görsel indirme sınırları: en fazla bayt ve toplam süre (saniye)
+IMAGE_DOWNLOAD_MAX_BYTES = int(os.getenv("IMAGE_DOWNLOAD_MAX_BYTES", str(15 * 1024 * 1024)))
+IMAGE_DOWNLOAD_TIMEOUT = float(os.getenv("IMAGE_DOWNLOAD_TIMEOUT", "20"))
+
+
+# Aday görsel puanlama ağırlıkları (ayar ve benchmark için dışarıdan değiştirilebilir)
+IMAGE_SCORING_WEIGHTS = {
+    "aspect": 4.0,      # Hedef en-boy oranından sapma (kırpılarak kaybedilen alan)
+    "pixels": 1.0,      # Hedefin üstündeki fazla piksel (indirme ve yeniden boyutlama maliyeti)
+    "undersize": 10.0,  # Hedefi kaplamayan görsel (büyütme gerekir)
+}
+
+# Pexels src varyantları: ad -> (kutu genişliği, kutu yüksekliği, kırpma)
+PEXELS_RENDITIONS = {
+    "large2x": (1880, 1300, False),
+    "large": (940, 650, False),
+    "medium": (None, 350, False),
+    "landscape": (1200, 627, True),
+}
+
+# Unsplash sabit varyantları: ad -> genişlik
+UNSPLASH_RENDITIONS = {
+    "regular": 1080,
+    "small": 400,
+}
+
+
+def _fit_within(width: int, height: int, box_width: Optional[int], box_height: Optional[int]) -> Tuple[int, int]:
+    """Görseli oranını koruyarak kutuya sığdırır (büyütmez)."""
+    scale = 1.0
+    if box_width:
+        scale = min(scale, box_width / width)
+    if box_height:
+        scale = min(scale, box_height / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def score_rendition(width: int, height: int, target: Tuple[int, int] = NEWS_IMAGE_SIZE,
+                    weights: Optional[Dict[str, float]] = None) -> float:
+    """Görsel varyantını hedef alana uygunluğuna göre puanlar (yüksek daha iyi).
+    
+    Hedefi kaplayan, oranı hedefe yakın ve gereksiz büyük olmayan varyant tercih edilir.
+    """
+    weights = weights or IMAGE_SCORING_WEIGHTS
+    target_width, target_height = target
+    
+    aspect_error = abs(math.log((width / height) / (target_width / target_height)))
+    # Hedefi kaplamak için gereken ölçek; 1'den büyükse görsel küçük kalıyor
+    cover_scale = max(target_width / width, target_height / height)
+    undersize = math.log(cover_scale) if cover_scale > 1 else 0.0
+    excess_pixels = math.log(max(1.0, (width * height) / (target_width * target_height)))
+    
+    return -(
+        weights["aspect"] * aspect_error
+        + weights["pixels"] * excess_pixels
+        + weights["undersize"] * undersize
+    )
+
+
+def unsplash_candidates(result: Dict, target: Tuple[int, int] = NEWS_IMAGE_SIZE) -> List[Dict]:
+    """Unsplash sonucunun indirilebilir varyantlarını boyutlarıyla listeler."""
+    width, height = result.get("width"), result.get("height")
+    urls = result.get("urls", {})
+    if not width or not height:
+        # Metadata yoksa 'regular' varyantı hedef oranında varsayılır
+        return [{"url": urls["regular"], "width": 1080, "height": 1080 * target[1] // target[0]}] if urls.get("regular") else []
+    
+    candidates = []
+    for name, box_width in UNSPLASH_RENDITIONS.items():
+        if urls.get(name):
+            rendition_width, rendition_height = _fit_within(width, height, box_width, None)
+            candidates.append({"url": urls[name], "width": rendition_width, "height": rendition_height})
+    
+    # raw URL dinamik boyutlandırma destekler: hedefi tam kaplayan en küçük genişlik
+    if urls.get("raw"):
+        cover_width = min(width, max(target[0], math.ceil(target[1] * width / height)))
+        rendition_width, rendition_height = _fit_within(width, height, cover_width, None)
+        separator = "&" if "?" in urls["raw"] else "?"
+        candidates.append({
+            "url": f"{urls['raw']}{separator}w={cover_width}&fm=jpg&q=80",
+            "width": rendition_width,
+            "height": rendition_height
+        })
+    return candidates
+
+
+def pexels_candidates(photo: Dict) -> List[Dict]:
+    """Pexels sonucunun indirilebilir varyantlarını boyutlarıyla listeler."""
+    width, height = photo.get("width"), photo.get("height")
+    src = photo.get("src", {})
+    if not width or not height:
+        return [{"url": src["large"], "width": 940, "height": 650}] if src.get("large") else []
+    
+    candidates = []
+    for name, (box_width, box_height, cropped) in PEXELS_RENDITIONS.items():
+        if not src.get(name):
+            continue
+        if cropped:
+            rendition_width, rendition_height = box_width, box_height
+        else:
+            rendition_width, rendition_height = _fit_within(width, height, box_width, box_height)
+        candidates.append({"url": src[name], "width": rendition_width, "height": rendition_height})
+    return candidates
+
+
+def pick_best_candidate(candidates: List[Dict], target: Tuple[int, int] = NEWS_IMAGE_SIZE) -> Optional[Dict]:
+    """Adaylar arasından en yüksek puanlı varyantı seçer; puanı 'score' alanına yazar."""
+    for candidate in candidates:
+        candidate["score"] = score_rendition(candidate["width"], candidate["height"], target)
+    return max(candidates, key=lambda candidate: candidate["score"], default=None)
+
 
-def search_unsplash(query: str, orientation: str = "landscape") -> Optional[str]:
+def search_unsplash(query: str, orientation: str = "landscape", timeout: float = IMAGE_SEARCH_TIMEOUT) -> Optional[str]:
     """Unsplash'tan görsel arar."""
+    cached_url = get_cached_search("unsplash", f"{orientation}:{query}")
+    if cached_url:
+        print(f"Unsplash sonucu cache'ten: {cached_url}")
+        return cached_url
+    
     if not UNSPLASH_ACCESS_KEY:
         print("UNSPLASH_ACCESS_KEY bulunamadı")
         return None
@@ -32,15 +160,17 @@ def search_unsplash(query: str, orientation: str = "landscape") -> Optional[str]
     }
     
     try:
-        response = requests.get(url, params=params, headers=headers)
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
         response.raise_for_status()
         data = response.json()
         
         if data.get("results"):
-            # İlk uygun görseli döndür
-            image_url = data["results"][0]["urls"]["regular"]
-            print(f"Unsplash görsel bulundu: {image_url}")
-            return image_url
+            # Tüm sonuçların varyantlarını metadata ile puanla, en uygununu döndür
+            best = pick_best_candidate([c for result in data["results"] for c in unsplash_candidates(result)])
+            if best:
+                print(f"Unsplash görsel bulundu ({best['width']}x{best['height']}): {best['url']}")
+                store_search("unsplash", f"{orientation}:{query}", best["url"])
+                return best["url"]
         
         return None
     except Exception as e:
@@ -48,8 +178,13 @@ def search_unsplash(query: str, orientation: str = "landscape") -> Optional[str]
         return None
 
 
-def search_pexels(query: str, orientation: str = "landscape") -> Optional[str]:
+def search_pexels(query: str, orientation: str = "landscape", timeout: float = IMAGE_SEARCH_TIMEOUT) -> Optional[str]:
     """Pexels'tan görsel arar."""
+    cached_url = get_cached_search("pexels", f"{orientation}:{query}")
+    if cached_url:
+        print(f"Pexels sonucu cache'ten: {cached_url}")
+        return cached_url
+    
     if not PEXELS_API_KEY:
         print("PEXELS_API_KEY bulunamadı")
         return None
@@ -65,15 +200,17 @@ def search_pexels(query: str, orientation: str = "landscape") -> Optional[str]:
     }
     
     try:
-        response = requests.get(url, params=params, headers=headers)
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
         response.raise_for_status()
         data = response.json()
         
         if data.get("photos"):
-            # İlk uygun görseli döndür
-            image_url = data["photos"][0]["src"]["large"]
-            print(f"Pexels görsel bulundu: {image_url}")
-            return image_url
+            # Tüm sonuçların varyantlarını metadata ile puanla, en uygununu döndür
+            best = pick_best_candidate([c for photo in data["photos"] for c in pexels_candidates(photo)])
+            if best:
+                print(f"Pexels görsel bulundu ({best['width']}x{best['height']}): {best['url']}")
+                store_search("pexels", f"{orientation}:{query}", best["url"])
+                return best["url"]
         
         return None
     except Exception as e:
@@ -82,19 +219,44 @@ def search_pexels(query: str, orientation: str = "landscape") -> Optional[str]:
 
 
 def download_image(url: str, output_path: str) -> bool:
-    """Görseli indirir."""
+    """Görseli indirir; daha önce indirildiyse cache'ten kopyalar."""
+    if copy_cached_image(url, output_path):
+        print(f"Görsel cache'ten alındı: {output_path}")
+        return True
+    
+    tmp_path = f"{output_path}.part"
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        deadline = time.monotonic() + IMAGE_DOWNLOAD_TIMEOUT
+        with requests.get(url, stream=True, timeout=(5, IMAGE_DOWNLOAD_TIMEOUT)) as response:
+            response.raise_for_status()
+            
+            content_type = response.headers.get("Content-Type", "")
+            if not content_type.startswith("image/"):
+                raise ValueError(f"Görsel olmayan içerik: {content_type or 'bilinmiyor'}")
+            
+            content_length = int(response.headers.get("Content-Length") or 0)
+            if content_length > IMAGE_DOWNLOAD_MAX_BYTES:
+                raise ValueError(f"Görsel çok büyük: {content_length} bayt")
+            
+            received = 0
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    received += len(chunk)
+                    if received > IMAGE_DOWNLOAD_MAX_BYTES:
+                        raise ValueError(f"Görsel {IMAGE_DOWNLOAD_MAX_BYTES} bayt sınırını aştı")
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Görsel {IMAGE_DOWNLOAD_TIMEOUT:.0f} sn içinde inmedi")
+                    f.write(chunk)
         
-        print(f"Görsel indirildi: {output_path}")
+        # Yarım kalan indirme eski görselin üzerine yazılmasın
+        os.replace(tmp_path, output_path)
+        store_image_file(url, output_path)
+        print(f"Görsel indirildi: {output_path} ({received} bayt)")
         return True
     except Exception as e:
         print(f"Görsel indirme hatası: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
 
 
@@ -134,24 +296,64 @@ def extract_keywords_for_image(keywords: List[str], title: str) -> str:
     return search_query.strip()
 
 
+def _search_plan(search_query: str) -> List[Tuple[Callable[..., Optional[str]], str]]:
+    """Öncelik sırasıyla denenecek (sağlayıcı, sorgu) listesi."""
+    return [
+        (search_unsplash, search_query),
+        (search_pexels, search_query),
+        # Bulunamazsa genel Polonya görseli
+        (search_unsplash, "Poland city architecture"),
+        (search_pexels, "Poland warsaw"),
+    ]
+
+
+def _find_image_url_sequential(search_query: str) -> Optional[str]:
+    """Sağlayıcıları sırayla dener, ilk bulunan görseli döner."""
+    for search, query in _search_plan(search_query):
+        image_url = search(query)
+        if image_url:
+            return image_url
+    return None
+
+
+def _find_image_url_concurrent(search_query: str, deadline: float = IMAGE_SEARCH_TIMEOUT) -> Optional[str]:
+    """Tüm sağlayıcıları aynı anda sorgular, önceliğe göre ilk uygun sonucu döner.
+    
+    Yüksek öncelikli sağlayıcı süresi içinde sonuç vermezse sıradakine geçilir;
+    geride kalan istekler beklenmez, sonuçları yok sayılır.
+    """
+    plan = _search_plan(search_query)
+    executor = ThreadPoolExecutor(max_workers=len(plan))
+    futures = [executor.submit(search, query) for search, query in plan]
+    deadline_at = time.monotonic() + deadline
+    
+    try:
+        for (search, query), future in zip(plan, futures):
+            try:
+                image_url = future.result(timeout=max(0.0, deadline_at - time.monotonic()))
+            except FutureTimeoutError:
+                print(f"Görsel araması süre aşımı: {search.__name__} ({query})")
+                continue
+            except Exception as e:
+                print(f"Görsel araması hatası: {e}")
+                continue
+            
+            if image_url:
+                return image_url
+        return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def find_news_image(keywords: List[str], title: str, output_path: str) -> Optional[str]:
     """Haber için görsel bulur ve indirir."""
     search_query = extract_keywords_for_image(keywords, title)
     print(f"Görsel arama sorgusu: {search_query}")
     
-    # Önce Unsplash dene
-    image_url = search_unsplash(search_query)
-    
-    # Unsplash'ta bulunamazsa Pexels dene
-    if not image_url:
-        image_url = search_pexels(search_query)
-    
-    # Hala bulunamazsa genel Polonya görseli ara
-    if not image_url:
-        image_url = search_unsplash("Poland city architecture")
-    
-    if not image_url:
-        image_url = search_pexels("Poland warsaw")
+    if IMAGE_SEARCH_CONCURRENT:
+        image_url = _find_image_url_concurrent(search_query)
+    else:
+        image_url = _find_image_url_sequential(search_query)
     
     # Görseli indir
     if image_url:
@@ -3,6 +3,7 @@ Instagram Poster - Instagram Graph API ile paylaşım yapar.
 """
 
 import os
+import mimetypes
 import requests
 from typing import Optional
 import time
@@ -60,12 +61,14 @@ def upload_image_to_hosting(image_path: str) -> Optional[str]:
     
     if supabase_url and supabase_key:
         bucket = "instagram-posts"
-        filename = f"post_{int(time.time())}.png"
+        extension = os.path.splitext(image_path)[1].lower() or ".png"
+        filename = f"post_{int(time.time())}{extension}"
+        content_type = mimetypes.guess_type(image_path)[0] or "image/png"
         
         url = f"{supabase_url}/storage/v1/object/{bucket}/{filename}"
         headers = {
             "Authorization": f"Bearer {supabase_key}",
-            "Content-Type": "image/png"
+            "Content-Type": content_type
         }
         
         try:
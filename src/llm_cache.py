@@ -0,0 +1,179 @@
+"""
+LLM Cache - OpenAI yanıtlarını içerik hash'ine göre SQLite'ta saklar.
+Aynı model/prompt/sistem mesajı/temperature ile yapılan tekrar çağrılar API'ye gitmez.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import closing
+from typing import Callable, Dict, List, Optional, Pattern
+
+from openai_client import create_chat_completion, stream_chat_completion_until
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))  # saniye
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(10 * 1024 * 1024)))
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+# Bu çalışmadaki cache istatistikleri
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _connect() -> sqlite3.Connection:
+    """Veritabanına bağlanır ve tabloyu gerekirse oluşturur."""
+    db_dir = os.path.dirname(LLM_CACHE_PATH)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    
+    conn = sqlite3.connect(LLM_CACHE_PATH)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def make_cache_key(model: str, messages: List[Dict], temperature: float, **params) -> str:
+    """Model, mesajlar (sistem + prompt), temperature ve ek parametrelerden cache anahtarı üretir."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "params": params},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(key: str) -> Optional[str]:
+    """Süresi dolmamış yanıtı döner ve son erişim zamanını günceller."""
+    if LLM_CACHE_DISABLED:
+        return None
+    
+    now = time.time()
+    try:
+        with closing(_connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row and now - row[1] <= LLM_CACHE_TTL:
+                conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                response = row[0]
+            else:
+                if row:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                response = None
+    except sqlite3.Error as e:
+        print(f"LLM cache okunamadı: {e}")
+        response = None
+    
+    if response is None:
+        _stats["misses"] += 1
+    else:
+        _stats["hits"] += 1
+    return response
+
+
+def _evict(conn: sqlite3.Connection, now: float) -> None:
+    """Süresi dolanları siler, boyut sınırı aşılırsa en eski erişilenleri (LRU) atar."""
+    expired = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - LLM_CACHE_TTL,)).rowcount
+    _stats["evictions"] += max(expired, 0)
+    
+    total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+    if total_size <= LLM_CACHE_MAX_BYTES:
+        return
+    
+    to_delete = []
+    for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC"):
+        if total_size <= LLM_CACHE_MAX_BYTES:
+            break
+        to_delete.append((key,))
+        total_size -= size
+    
+    conn.executemany("DELETE FROM llm_cache WHERE key = ?", to_delete)
+    _stats["evictions"] += len(to_delete)
+
+
+def store_response(key: str, response: str) -> None:
+    """Yanıtı cache'e yazar ve gerekirse eviction uygular."""
+    if LLM_CACHE_DISABLED or not response:
+        return
+    
+    now = time.time()
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), now, now)
+            )
+            _evict(conn, now)
+    except sqlite3.Error as e:
+        print(f"LLM cache yazılamadı: {e}")
+
+
+def is_json_response(text: str) -> bool:
+    """Yanıtın (varsa markdown code block içindeki) geçerli JSON olup olmadığını kontrol eder."""
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+
+def cached_chat_completion(model: str, messages: List[Dict], temperature: float,
+                           validate: Optional[Callable[[str], bool]] = None,
+                           use_cache: bool = True, stream_until: Optional[Pattern] = None,
+                           **params) -> str:
+    """Chat completion yanıt metnini cache'ten döner, yoksa API'yi çağırıp saklar.
+    
+    validate verilirse sadece doğrulamayı geçen yanıtlar saklanır.
+    use_cache=False cache'i okumadan API'yi çağırır (yanıt yine saklanır).
+    stream_until verilirse yanıt akış olarak okunur ve desen eşleşince kesilir.
+    """
+    key = make_cache_key(model, messages, temperature, **params)
+    
+    cached = get_cached_response(key) if use_cache else None
+    if cached is not None:
+        print("LLM cache isabeti, API çağrısı atlandı.")
+        return cached
+    
+    if stream_until is not None:
+        content = stream_chat_completion_until(
+            stream_until,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **params
+        )
+    else:
+        response = create_chat_completion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **params
+        )
+        content = response.choices[0].message.content.strip()
+    if validate is None or validate(content):
+        store_response(key, content)
+    return content
+
+
+def cache_stats() -> Dict[str, int]:
+    """Bu çalışmadaki hit/miss/eviction sayaçlarını döner."""
+    return dict(_stats)
@@ -10,38 +10,74 @@ from datetime import datetime
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from rss_parser import get_poland_news_today, get_poland_news_all
+from rss_parser import get_country_news_today, get_country_news_all, TARGET_COUNTRIES
 from ai_selector import select_most_important_news
-from ai_summarizer import summarize_news
+from ai_summarizer import summarize_news, repair_stats
 from image_search import find_news_image, use_default_image
 from image_generator import generate_instagram_post
 from instagram_poster import post_to_instagram
+from seen_store import filter_unseen, mark_evaluated, mark_posted
+from news_dedup import cluster_news
+from news_ranker import rank_news, SELECTION_TOP_K
+from llm_cache import cache_stats
+from history_index import add_posted
 
 
-def run_automation():
+DEFAULT_COUNTRY = "pl"
+
+# Paylaşım akışı (seçim prompt'u, görsel sorguları, bayrak, Instagram hesabı) sadece
+# bu ülkeler için yapılandırılmış; diğer ülkeler veri katmanında okunur ama paylaşılmaz.
+PUBLISH_COUNTRIES = ("pl",)
+
+
+def get_output_path(filename: str, country: str = DEFAULT_COUNTRY) -> str:
+    """Ülkeye göre çıktı dosya yolunu döner (varsayılan ülke output/ kökünü kullanır)."""
+    if country == DEFAULT_COUNTRY:
+        return os.path.join("output", filename)
+    return os.path.join("output", country, filename)
+
+
+def run_automation(country: str = DEFAULT_COUNTRY):
     """Ana otomasyon fonksiyonu."""
+    if country not in PUBLISH_COUNTRIES:
+        print(f"❌ [{country}] için paylaşım yapılandırılmamış (prompt, görsel, bayrak ve hesap Polonya'ya özel).")
+        return False
+    
     print("=" * 60)
-    print(f"🚀 Social Automation Başlatılıyor - {datetime.now()}")
+    print(f"🚀 Social Automation Başlatılıyor [{country}] - {datetime.now()}")
     print("=" * 60)
     
-    # 1. RSS Feed'den Polonya haberlerini çek
+    # 1. RSS Feed'lerden ülke haberlerini çek (feed'ler çalışma başına bir kez okunur)
     print("\n📰 [1/6] RSS Feed okunuyor...")
-    news = get_poland_news_today()
+    news = get_country_news_today(country)
     
     # Bugün haber yoksa son haberleri al
     if not news:
-        print("⚠️ Bugün haber yok, son Polonya haberlerinden seçim yapılacak...")
-        news = get_poland_news_all()
+        print(f"⚠️ Bugün haber yok, son [{country}] haberlerinden seçim yapılacak...")
+        news = get_country_news_all(country)
     
     if not news:
         print("❌ Hiç haber bulunamadı! Otomasyon sonlandırılıyor.")
         return False
     
+    # Daha önce paylaşılmış haberleri LLM'e göndermeden ele
+    news = filter_unseen(news)
+    
+    if not news:
+        print("❌ Yeni haber yok, hepsi daha önce paylaşılmış! Otomasyon sonlandırılıyor.")
+        return False
+    
+    # Aynı olayı anlatan haberleri tek temsilciye indir
+    news = cluster_news(news)
+    
     print(f"✅ {len(news)} haber bulundu.")
     
     # 2. En kritik haberi seç
     print("\n🎯 [2/6] AI ile en kritik haber seçiliyor...")
-    selected_news = select_most_important_news(news[:15])  # İlk 15 haberi gönder
+    # Tüm haberleri yerel olarak puanla, en iyi K adayı gönder
+    candidates = rank_news(news, top_k=SELECTION_TOP_K)
+    selected_news = select_most_important_news(candidates)
+    mark_evaluated(candidates)
     
     if not selected_news:
         print("❌ Haber seçilemedi! Otomasyon sonlandırılıyor.")
@@ -59,10 +95,15 @@ def run_automation():
     
     print(f"✅ Özet oluşturuldu:\n{summary['full_text']}")
     
+    stats = cache_stats()
+    print(f"ℹ️ LLM cache: {stats['hits']} isabet, {stats['misses']} ıska")
+    repairs = repair_stats()
+    print(f"ℹ️ Özet düzeltme: {repairs['repair_requests']} ek istek, {repairs['repair_prompt_tokens']} prompt token")
+    
     # 4. Haber için görsel bul
     print("\n🖼️ [4/6] Haber görseli aranıyor...")
-    news_image_path = "output/news_image.jpg"
-    os.makedirs("output", exist_ok=True)
+    news_image_path = get_output_path("news_image.jpg", country)
+    os.makedirs(os.path.dirname(news_image_path), exist_ok=True)
     
     image_path = find_news_image(
         summary.get('keywords', []),
@@ -82,7 +123,7 @@ def run_automation():
     
     # 5. Instagram görseli oluştur
     print("\n🎨 [5/6] Instagram görseli oluşturuluyor...")
-    output_path = "output/instagram_post.png"
+    output_path = get_output_path("instagram_post.png", country)
     
     post_image = generate_instagram_post(
         summary['full_text'],
@@ -112,6 +153,8 @@ def run_automation():
     
     if post_id:
         print(f"✅ Paylaşım başarılı! Post ID: {post_id}")
+        mark_posted(selected_news)
+        add_posted(summary['full_text'], selected_news.get('title', ''))
     else:
         print("❌ Paylaşım başarısız!")
         return False
@@ -124,5 +167,11 @@ def run_automation():
 
 
 if __name__ == "__main__":
-    success = run_automation()
+    countries = [country for country in TARGET_COUNTRIES if country in PUBLISH_COUNTRIES]
+    for country in TARGET_COUNTRIES:
+        if country not in PUBLISH_COUNTRIES:
+            print(f"⚠️ [{country}] için paylaşım yapılandırılmamış, atlanıyor.")
+    
+    results = [run_automation(country) for country in countries]
+    success = bool(results) and all(results)
     sys.exit(0 if success else 1)
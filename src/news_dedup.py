@@ -0,0 +1,159 @@
+"""
+News Dedup - Aynı olayı anlatan haberleri MinHash + LSH ile kümeler.
+Her kümeden tek temsilci döner, küme büyüklüğü 'coverage' olarak işaretlenir.
+"""
+
+import os
+import re
+import zlib
+from typing import List, Dict, Set, Tuple
+
+import numpy as np
+
+# MinHash parametreleri: BANDS * ROWS = NUM_PERM
+# Eşik yaklaşık (1/BANDS)^(1/ROWS) ~ 0.5 Jaccard benzerliği
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+
+# Aday çiftlerin aynı küme sayılması için gereken tahmini Jaccard benzerliği
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+
+# İmza için içerikten kullanılacak en fazla kelime sayısı
+MAX_CONTENT_WORDS = 80
+
+# (a * h + b) mod p hash aileleri; p < 2^31 olduğundan çarpım uint64'e taşmadan sığar
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(1337)
+_PERM_A = _rng.integers(1, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64)[:, None]
+_PERM_B = _rng.integers(0, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64)[:, None]
+
+# Boş metnin imza değeri (hiçbir hash bu değeri almaz)
+_EMPTY_SLOT = _MERSENNE_PRIME
+
+# Tek seferde işlenecek en fazla shingle sayısı (NUM_PERM x bu kadar uint64 bellek)
+_SHINGLE_CHUNK = 32768
+
+
+def _tokenize(text: str) -> List[str]:
+    """Metni HTML etiketlerinden arındırıp küçük harfli kelimelere böler."""
+    text = re.sub(r"<[^>]+>", " ", text or "")
+    return re.findall(r"\w+", text.casefold())
+
+
+def _shingles(item: Dict) -> Set[int]:
+    """Başlık ve içerik başından kelime 2-gram'larının hash kümesini üretir."""
+    content = item.get('clean_content') or item.get('content') or item.get('description', '')
+    title_words = _tokenize(item.get('title', ''))
+    content_words = _tokenize(content)[:MAX_CONTENT_WORDS]
+    
+    shingles = set()
+    for words in (title_words, content_words):
+        if len(words) == 1:
+            shingles.add(zlib.crc32(words[0].encode("utf-8")))
+        for i in range(len(words) - 1):
+            shingles.add(zlib.crc32(f"{words[i]} {words[i + 1]}".encode("utf-8")))
+    return shingles
+
+
+def minhash_signatures(shingle_sets: List[Set[int]]) -> np.ndarray:
+    """Shingle kümelerinin MinHash imzalarını vektörel hesaplar; (haber sayısı, NUM_PERM) matris döner."""
+    signatures = np.full((len(shingle_sets), NUM_PERM), _EMPTY_SLOT, dtype=np.uint64)
+    
+    # Shingle'ları yığınlar halinde tek dizide topla; her haberin başlangıç ofseti tutulur
+    start = 0
+    while start < len(shingle_sets):
+        rows, offsets, values = [], [], []
+        total = 0
+        end = start
+        while end < len(shingle_sets) and (total == 0 or total + len(shingle_sets[end]) <= _SHINGLE_CHUNK):
+            if shingle_sets[end]:
+                rows.append(end)
+                offsets.append(total)
+                values.extend(shingle_sets[end])
+                total += len(shingle_sets[end])
+            end += 1
+        
+        if values:
+            hashes = np.array(values, dtype=np.uint64) % np.uint64(_MERSENNE_PRIME)
+            permuted = (_PERM_A * hashes[None, :] + _PERM_B) % np.uint64(_MERSENNE_PRIME)
+            signatures[rows] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    
+    return signatures
+
+
+def minhash_signature(shingles: Set[int]) -> Tuple[int, ...]:
+    """Tek shingle kümesinin MinHash imzasını hesaplar."""
+    return tuple(int(value) for value in minhash_signatures([shingles])[0])
+
+
+def estimate_similarity(sig_a, sig_b) -> float:
+    """İki MinHash imzasından Jaccard benzerliğini tahmin eder."""
+    return float(np.count_nonzero(np.asarray(sig_a) == np.asarray(sig_b))) / NUM_PERM
+
+
+def _find(parents: List[int], i: int) -> int:
+    """Union-find kök bulma (yol sıkıştırmalı)."""
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def cluster_news(news_items: List[Dict], threshold: float = DEDUP_THRESHOLD) -> List[Dict]:
+    """Yakın kopya haberleri kümeler ve her kümeden ilk haberi döner.
+    
+    LSH bantlama ile sadece aynı kovaya düşen çiftler karşılaştırılır;
+    temsilciye 'coverage' (küme büyüklüğü) ve 'cluster_sources' eklenir.
+    """
+    if len(news_items) < 2:
+        for item in news_items:
+            item['coverage'] = 1
+        return news_items
+    
+    signatures = minhash_signatures([_shingles(item) for item in news_items])
+    parents = list(range(len(news_items)))
+    
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    for index, signature in enumerate(signatures):
+        if signature[0] == _EMPTY_SLOT:
+            continue  # Boş metin, kümelenmez
+        for band in range(LSH_BANDS):
+            band_key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+            buckets.setdefault(band_key, []).append(index)
+    
+    compared = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if (i, j) in compared:
+                    continue
+                compared.add((i, j))
+                if estimate_similarity(signatures[i], signatures[j]) >= threshold:
+                    root_i, root_j = _find(parents, i), _find(parents, j)
+                    if root_i != root_j:
+                        # Listede önce gelen haber temsilci olsun
+                        parents[max(root_i, root_j)] = min(root_i, root_j)
+    
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(news_items)):
+        clusters.setdefault(_find(parents, index), []).append(index)
+    
+    representatives = []
+    for root in sorted(clusters):
+        members = clusters[root]
+        representative = news_items[root]
+        representative['coverage'] = len(members)
+        representative['cluster_sources'] = [
+            news_items[i].get('source', '') for i in members if news_items[i].get('source')
+        ]
+        representatives.append(representative)
+    
+    merged = len(news_items) - len(representatives)
+    if merged:
+        print(f"Yakın kopya {merged} haber kümelendi, {len(representatives)} farklı haber kaldı.")
+    
+    return representatives
@@ -0,0 +1,214 @@
+"""
+News Ranker - Haberleri LLM'e göndermeden önce yerel ve deterministik olarak puanlar.
+SELECTION_PROMPT'taki öncelik kurallarını (politika/ekonomi/göç yüksek, spor/magazin düşük)
+kategori ağırlıkları, anahtar kelime sözlüğü, TF-IDF ve yenilik ile uygular.
+"""
+
+import os
+import re
+import math
+import time
+from typing import List, Dict, Optional
+
+# LLM'e gönderilecek aday sayısı
+SELECTION_TOP_K = int(os.getenv("SELECTION_TOP_K", "15"))
+
+# Yenilik puanının yarıya indiği süre (saat)
+RECENCY_HALF_LIFE_HOURS = 12.0
+
+# Kelime kökü olarak kullanılacak ön ek uzunluğu (Türkçe ekleri kabaca atmak için)
+STEM_LENGTH = 6
+
+# Puan bileşenlerinin ağırlıkları (ayar ve benchmark için dışarıdan değiştirilebilir)
+RANKING_WEIGHTS = {
+    "category": 1.0,
+    "keywords": 1.0,
+    "tfidf": 2.0,
+    "recency": 1.0,
+    "coverage": 0.5,
+}
+
+# Kategori adında geçen kök -> ağırlık
+CATEGORY_WEIGHTS = {
+    "politi": 2.0, "polity": 2.0, "gündem": 1.5, "ekonomi": 2.0, "gospodar": 2.0, "econom": 2.0,
+    "business": 1.5, "iş": 1.0, "göç": 2.5, "migra": 2.5, "hukuk": 1.5, "law": 1.5, "prawo": 1.5,
+    "sağlık": 1.0, "health": 1.0, "zdrow": 1.0, "güvenlik": 1.0, "security": 1.0,
+    "spor": -2.0, "sport": -2.0, "magazin": -2.0, "kültür": -0.5, "culture": -0.5,
+    "eğlence": -2.0, "entertain": -2.0, "rozryw": -2.0,
+}
+
+# Başlık/içerikte geçen kök -> ağırlık (TR / EN / PL)
+KEYWORD_LEXICON = {
+    # Göç, vize, oturum
+    "göç": 3.0, "göçmen": 3.0, "mülteci": 3.0, "vize": 3.0, "oturum": 3.0, "yabancı": 2.0,
+    "migra": 3.0, "immigra": 3.0, "refugee": 3.0, "visa": 3.0, "residen": 2.0, "foreign": 2.0,
+    "imigra": 3.0, "uchodź": 3.0, "wiza": 2.0, "wizy": 2.0, "cudzoz": 3.0, "pobyt": 3.0,
+    # Politika ve mevzuat
+    "yasa": 2.5, "kanun": 2.5, "hükümet": 2.0, "başbaka": 2.0, "cumhurb": 2.0, "seçim": 2.0, "meclis": 2.0,
+    "law": 2.0, "laws": 2.0, "governm": 2.0, "minister": 2.0, "presiden": 2.0, "election": 2.0, "parliam": 2.0,
+    "ustaw": 2.5, "rząd": 2.0, "premier": 2.0, "prezyden": 2.0, "wybor": 2.0, "sejm": 2.0,
+    # Ekonomi
+    "enflasy": 2.5, "asgari": 2.5, "ücret": 2.0, "maaş": 2.0, "vergi": 2.5, "zam": 1.5, "zaml": 1.5, "zamm": 1.5, "ekonomi": 2.0,
+    "inflati": 2.5, "wage": 2.0, "salary": 2.0, "tax": 2.5, "taxes": 2.5, "taxat": 2.5, "econom": 2.0, "price": 1.5,
+    "inflac": 2.5, "płac": 2.0, "podat": 2.5, "cen": 1.0, "ceny": 1.0,
+    # Güvenlik ve sağlık
+    "güvenl": 1.5, "polis": 1.0, "sağlık": 1.5, "hastane": 1.0, "security": 1.5, "police": 1.0, "health": 1.5,
+    # Düşük öncelik
+    "spor": -2.5, "futbol": -2.5, "maç": -2.0, "maçı": -2.0, "lig": -1.5, "ligi": -1.5, "magazin": -2.5, "ünlü": -2.0, "dizi": -1.5,
+    "sport": -2.5, "football": -2.5, "match": -2.0, "celebri": -2.5, "piłk": -2.5, "mecz": -2.0,
+}
+
+# TF-IDF benzerliği için göç/ekonomi tohum sözlüğü
+SEED_VOCABULARY = [
+    "göçmen", "mülteci", "vize", "oturum", "yabancı", "çalışma", "izin", "sınır",
+    "ekonomi", "enflasyon", "asgari", "ücret", "vergi", "fiyat", "zam", "emekli",
+    "migration", "migrant", "refugee", "visa", "residence", "permit", "border",
+    "economy", "inflation", "wage", "tax", "prices",
+    "migracja", "cudzoziemcy", "pobyt", "granica", "inflacja", "płaca", "podatek",
+]
+
+# Bu uzunluktan kısa kökler sadece tam kelime olarak eşleşir ("zam" -> "zaman" değil)
+_MIN_PREFIX = 4
+
+
+def _normalize(text: str) -> str:
+    """Metni küçültür; noktalı/noktasız i farkı (TR/EN/PL) tek 'i'ye katlanır."""
+    text = re.sub(r"<[^>]+>", " ", text or "")
+    return text.replace("İ", "i").lower().replace("ı", "i")
+
+
+def _fold_lexicon(lexicon: Dict[str, float]) -> Dict[str, float]:
+    """Sözlük anahtarlarını metinle aynı şekilde normalize eder."""
+    return {_normalize(stem): weight for stem, weight in lexicon.items()}
+
+
+def _tokens(text: str) -> List[str]:
+    """Metni kelimelere böler."""
+    return re.findall(r"\w+", _normalize(text))
+
+
+def _stem(token: str) -> str:
+    """Kelimeyi sabit uzunluklu köke indirir."""
+    return token[:STEM_LENGTH]
+
+
+def _prefix_weight(token: str, lexicon: Dict[str, float]) -> float:
+    """Token'ın sözlükteki en uzun eşleşen ön ekinin ağırlığını döner.
+    
+    lexicon normalize edilmiş olmalıdır (_fold_lexicon); kısa kökler sadece tam kelimeyle eşleşir.
+    """
+    weight = lexicon.get(token)
+    if weight is not None:
+        return weight
+    for length in range(len(token) - 1, _MIN_PREFIX - 1, -1):
+        weight = lexicon.get(token[:length])
+        if weight is not None:
+            return weight
+    return 0.0
+
+
+def category_score(item: Dict) -> float:
+    """Kategori adına göre puan."""
+    category = item.get('category') or ''
+    if isinstance(category, (list, tuple)):
+        category = " ".join(category)
+    lexicon = _fold_lexicon(CATEGORY_WEIGHTS)
+    scores = [_prefix_weight(token, lexicon) for token in _tokens(category)]
+    return max(scores, key=abs) if scores else 0.0
+
+
+def keyword_score(tokens: List[str]) -> float:
+    """Sözlükteki köklerin (her kök bir kez sayılarak) toplam ağırlığı."""
+    lexicon = _fold_lexicon(KEYWORD_LEXICON)
+    matched = {}
+    for token in tokens:
+        weight = _prefix_weight(token, lexicon)
+        if weight:
+            matched[_stem(token)] = weight
+    return sum(matched.values())
+
+
+def recency_score(item: Dict, now: float) -> float:
+    """Yayın zamanına göre üstel azalan puan (0-1)."""
+    published_ts = item.get('published_ts')
+    if not published_ts:
+        return 0.0
+    age_hours = max(0.0, (now - published_ts) / 3600)
+    return math.exp(-math.log(2) * age_hours / RECENCY_HALF_LIFE_HOURS)
+
+
+def _tfidf_scores(token_lists: List[List[str]]) -> List[float]:
+    """Her haberin tohum sözlüğe TF-IDF kosinüs benzerliği."""
+    stem_lists = [[_stem(token) for token in tokens] for tokens in token_lists]
+    doc_count = len(stem_lists)
+    
+    doc_freq: Dict[str, int] = {}
+    for stems in stem_lists:
+        for stem in set(stems):
+            doc_freq[stem] = doc_freq.get(stem, 0) + 1
+    
+    def idf(stem: str) -> float:
+        return math.log((1 + doc_count) / (1 + doc_freq.get(stem, 0))) + 1
+    
+    seed_stems = {_stem(token) for word in SEED_VOCABULARY for token in _tokens(word)}
+    seed_norm = math.sqrt(sum(idf(stem) ** 2 for stem in seed_stems))
+    
+    scores = []
+    for stems in stem_lists:
+        if not stems:
+            scores.append(0.0)
+            continue
+        term_freq: Dict[str, int] = {}
+        for stem in stems:
+            term_freq[stem] = term_freq.get(stem, 0) + 1
+        weights = {stem: (count / len(stems)) * idf(stem) for stem, count in term_freq.items()}
+        doc_norm = math.sqrt(sum(w ** 2 for w in weights.values()))
+        dot = sum(weights[stem] * idf(stem) for stem in seed_stems if stem in weights)
+        scores.append(dot / (doc_norm * seed_norm) if doc_norm and seed_norm else 0.0)
+    return scores
+
+
+def score_news(news_items: List[Dict], now: Optional[float] = None) -> List[float]:
+    """Haberleri puanlar ve puanı 'pre_score' alanına yazar."""
+    now = now if now is not None else time.time()
+    token_lists = [
+        _tokens(f"{item.get('title', '')} {item.get('clean_content') or item.get('content') or item.get('description', '')}")
+        for item in news_items
+    ]
+    tfidf = _tfidf_scores(token_lists)
+    
+    scores = []
+    for item, tokens, tfidf_score in zip(news_items, token_lists, tfidf):
+        # Çok sayıda anahtar kelime tek başına sıralamayı domine etmesin
+        keywords = keyword_score(tokens)
+        keywords = math.copysign(math.log1p(abs(keywords)), keywords)
+        
+        score = (
+            RANKING_WEIGHTS["category"] * category_score(item)
+            + RANKING_WEIGHTS["keywords"] * keywords
+            + RANKING_WEIGHTS["tfidf"] * tfidf_score
+            + RANKING_WEIGHTS["recency"] * recency_score(item, now)
+            + RANKING_WEIGHTS["coverage"] * math.log(item.get('coverage', 1) or 1)
+        )
+        item['pre_score'] = round(score, 4)
+        scores.append(score)
+    return scores
+
+
+def rank_news(news_items: List[Dict], top_k: Optional[int] = SELECTION_TOP_K) -> List[Dict]:
+    """Haberleri yerel puana göre sıralar ve ilk top_k haberi döner.
+    
+    Eşit puanlarda feed sırası korunur.
+    """
+    if not news_items:
+        return []
+    
+    scores = score_news(news_items)
+    order = sorted(range(len(news_items)), key=lambda i: -scores[i])
+    ranked = [news_items[i] for i in order]
+    
+    if top_k is not None:
+        ranked = ranked[:top_k]
+    
+    print(f"Ön sıralama: {len(news_items)} haberden {len(ranked)} aday seçildi.")
+    return ranked
@@ -0,0 +1,150 @@
+"""
+OpenAI Client - Paylaşılan, bağlantı havuzlu OpenAI istemcisi.
+Açık timeout'lar ve 429/5xx için Retry-After'a uyan, jitter'lı üstel geri çekilme ile tekrar dener.
+"""
+
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Pattern
+
+from openai import OpenAI, APIConnectionError, APIStatusError, Timeout
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+
+# Geri çekilme: BASE * 2^deneme, en fazla MAX saniye (jitter ile)
+OPENAI_BACKOFF_BASE = 1.0
+OPENAI_BACKOFF_MAX = 30.0
+
+# Sunucunun Retry-After değerine uyulacak en uzun bekleme (saniye)
+OPENAI_RETRY_AFTER_MAX = float(os.getenv("OPENAI_RETRY_AFTER_MAX", "60"))
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# JSON-schema structured output (kapalıysa serbest metin JSON beklenir)
+OPENAI_STRUCTURED_OUTPUT = os.getenv("OPENAI_STRUCTURED_OUTPUT", "1").lower() in ("1", "true", "yes")
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    """Modül genelinde paylaşılan OpenAI istemcisini döner (HTTP bağlantıları yeniden kullanılır)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # SDK'nın kendi bağlantı havuzu tekil istemciyle yeniden kullanılır;
+                # tekrar denemeleri kendimiz yönetiyoruz (Retry-After + jitter)
+                _client = OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    timeout=Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+                    max_retries=0
+                )
+    return _client
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Geçici (tekrar denenebilir) hata mı?"""
+    if isinstance(error, APIConnectionError):  # APITimeoutError dahil
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Hata yanıtındaki Retry-After (veya retry-after-ms) başlığını saniyeye çevirir."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _backoff_delay(attempt: int, error: Exception) -> float:
+    """Jitter'lı üstel bekleme süresi; sunucu Retry-After verdiyse en az o kadar
+    (en fazla OPENAI_RETRY_AFTER_MAX) bekler."""
+    cap = min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF_BASE * (2 ** attempt))
+    delay = random.uniform(cap / 2, cap)
+    retry_after = _retry_after_seconds(error)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, OPENAI_RETRY_AFTER_MAX))
+    return delay
+
+
+def json_schema_format(name: str, schema: Dict) -> Optional[Dict]:
+    """Structured output için response_format değerini döner; kapalıysa None."""
+    if not OPENAI_STRUCTURED_OUTPUT:
+        return None
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": schema}
+    }
+
+
+def create_chat_completion(**params):
+    """Paylaşılan istemciyle chat completion çağrısı yapar, geçici hatalarda tekrar dener.
+    
+    Değeri None olan parametreler API'ye gönderilmez.
+    """
+    client = get_openai_client()
+    params = {key: value for key, value in params.items() if value is not None}
+    
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            return client.chat.completions.create(**params)
+        except Exception as e:
+            if attempt >= OPENAI_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = _backoff_delay(attempt, e)
+            print(f"OpenAI geçici hata ({type(e).__name__}), {delay:.1f} sn sonra tekrar denenecek "
+                  f"({attempt + 1}/{OPENAI_MAX_RETRIES})")
+            time.sleep(delay)
+
+
+def stream_chat_completion_until(stop_pattern: Pattern, **params) -> str:
+    """Yanıtı akış olarak okur, biriken metin stop_pattern ile eşleşince akışı kapatır.
+    
+    Eşleşme olmazsa tam yanıt döner. Bağlantı kurulurken oluşan geçici
+    hatalar create_chat_completion ile tekrar denenir.
+    """
+    stream = create_chat_completion(stream=True, **params)
+    parts = []
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            if stop_pattern.search("".join(parts)):
+                break
+    finally:
+        stream.close()
+    return "".join(parts).strip()
@@ -0,0 +1,141 @@
+"""
+Prompt Builder - Yerel tokenizer ile token sayar ve prompt'ları token bütçesine sığdırır.
+İçerik cümle sınırlarından kısaltılır; bütçe haberler arasında önceliğe göre paylaştırılır.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken yoksa yaklaşık sayım kullanılır
+    tiktoken = None
+
+PROMPT_MODEL = "gpt-4o"
+
+# Seçim prompt'undaki haber içerikleri için toplam token bütçesi
+SELECTION_CONTENT_TOKEN_BUDGET = int(os.getenv("SELECTION_CONTENT_TOKEN_BUDGET", "3000"))
+
+# Özet prompt'undaki haber içeriği için token bütçesi
+SUMMARY_CONTENT_TOKEN_BUDGET = int(os.getenv("SUMMARY_CONTENT_TOKEN_BUDGET", "1500"))
+
+# tiktoken yokken token başına ortalama karakter sayısı
+APPROX_CHARS_PER_TOKEN = 4
+
+TRUNCATION_SUFFIX = "..."
+
+# Chat formatının mesaj başına ve yanıt başlangıcı için eklediği token sayısı
+MESSAGE_OVERHEAD_TOKENS = 3
+REPLY_PRIMING_TOKENS = 3
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """Model için tiktoken encoding'ini döner; yüklenemezse None (yaklaşık sayım kullanılır)."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # İlk kullanımda encoding dosyası indirilir; ağ yoksa yaklaşık sayıma düş
+        print(f"⚠️ tiktoken encoding yüklenemedi, yaklaşık token sayımı kullanılıyor: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = PROMPT_MODEL) -> int:
+    """Metnin token sayısını döner (tiktoken yoksa karakter sayısından yaklaşık)."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = PROMPT_MODEL) -> int:
+    """Chat mesajlarının toplam prompt token sayısını döner (rol ve mesaj çerçevesi dahil)."""
+    total = REPLY_PRIMING_TOKENS
+    for message in messages:
+        total += MESSAGE_OVERHEAD_TOKENS
+        total += count_tokens(message.get("role", ""), model) + count_tokens(message.get("content", ""), model)
+    return total
+
+
+def _truncate_words(text: str, max_tokens: int, model: str) -> str:
+    """Metni kelime sınırından, token sınırına sığacak şekilde kısaltır."""
+    words = text.split()
+    low, high = 0, len(words)
+    # Sığan en uzun kelime önekini ikili arama ile bul
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:mid]) + TRUNCATION_SUFFIX, model) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low]) + TRUNCATION_SUFFIX if low else ""
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = PROMPT_MODEL) -> str:
+    """Metni token sınırına cümle sınırlarından kısaltır.
+    
+    İlk cümle bile sığmıyorsa kelime sınırından kesilip '...' eklenir.
+    """
+    text = (text or "").strip()
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    
+    kept = []
+    used = 0
+    for sentence in _SENTENCE_END.split(text):
+        sentence_tokens = count_tokens(sentence + " ", model)
+        if used + sentence_tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used += sentence_tokens
+    
+    if kept:
+        return " ".join(kept)
+    return _truncate_words(text, max_tokens, model)
+
+
+def allocate_token_budget(needs: List[int], budget: int, priorities: Optional[List[float]] = None) -> List[int]:
+    """Token bütçesini önceliğe orantılı paylaştırır (water-filling).
+    
+    Bir haber ihtiyacından fazlasını almaz; artan pay diğerlerine dağıtılır.
+    Öncelik verilmezse liste sırasına göre azalan öncelik kullanılır.
+    """
+    count = len(needs)
+    if priorities is None:
+        priorities = [float(count - i) for i in range(count)]
+    weights = [max(p, 0.0) + 1e-6 for p in priorities]
+    
+    allocation = [0.0] * count
+    active = {i for i in range(count) if needs[i] > 0}
+    remaining = float(budget)
+    
+    while active and remaining >= 1:
+        total_weight = sum(weights[i] for i in active)
+        satisfied = set()
+        spent = 0.0
+        for i in active:
+            share = remaining * weights[i] / total_weight
+            give = min(share, needs[i] - allocation[i])
+            allocation[i] += give
+            spent += give
+            if allocation[i] >= needs[i]:
+                satisfied.add(i)
+        remaining -= spent
+        if not satisfied:
+            break
+        active -= satisfied
+    
+    return [int(a) for a in allocation]
@@ -2,60 +2,337 @@
 RSS Feed Parser - Polonya haberlerini filtreler ve bugünün haberlerini döner.
 """
 
+import os
+import json
+import hashlib
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
 import feedparser
-from datetime import datetime, timezone
+from content_cleaner import normalize_item
+from bisect import bisect_left
+from datetime import datetime, timezone, date
 from dateutil import parser as date_parser
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, IO, Tuple, Union, Collection
 import re
 
 RSS_FEED_URL = "https://iwjkgmvorjtxgjiebkll.supabase.co/storage/v1/object/public/rss-feeds/news-feed.xml"
 
+# Feed snapshot cache (ETag/Last-Modified + parse edilmiş haberler)
+FEED_CACHE_DIR = os.getenv("FEED_CACHE_DIR", ".cache/feeds")
 
-def parse_rss_feed(url: str = RSS_FEED_URL) -> List[Dict]:
-    """RSS feed'i parse eder ve tüm haberleri döner."""
-    feed = feedparser.parse(url)
+# Feed kayıt defteri: RSS_FEEDS='[{"url": "...", "country": "de"}, ...]'
+# country, <country> elementi olmayan item'lara atanacak varsayılan ülkedir.
+RSS_FEEDS = os.getenv("RSS_FEEDS", "")
+FEED_FETCH_WORKERS = int(os.getenv("FEED_FETCH_WORKERS", "4"))
+
+# İşlenecek ülkeler (virgülle ayrılmış ülke kodları)
+TARGET_COUNTRIES = [c.strip() for c in os.getenv("TARGET_COUNTRIES", "pl").split(",") if c.strip()]
+
+# Streaming mod: XML iterparse ile okunur, ülke filtresi dict oluşturulmadan uygulanır
+RSS_STREAMING = os.getenv("RSS_STREAMING", "").lower() in ("1", "true", "yes")
+FEED_FETCH_TIMEOUT = 30
+
+# RSS namespace'leri (content:encoded, dc:creator)
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+
+# Aynı çalışma içinde feed'i tekrar indirmemek için bellek içi kopya
+_feed_memo: Dict[str, List[Dict]] = {}
+_snapshot_memo: Dict[str, "FeedSnapshot"] = {}
+
+
+def _snapshot_path(url: str) -> str:
+    """Feed URL'i için snapshot dosya yolunu döner."""
+    url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(FEED_CACHE_DIR, f"{url_hash}.json")
+
+
+def load_feed_snapshot(url: str) -> Optional[Dict]:
+    """Diskteki feed snapshot'ını yükler, yoksa None döner."""
+    path = _snapshot_path(url)
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("url") != url:
+            return None
+        return snapshot
+    except Exception as e:
+        print(f"Feed snapshot okunamadı: {e}")
+        return None
+
+
+def save_feed_snapshot(url: str, etag: Optional[str], modified: Optional[str], items: List[Dict]) -> None:
+    """Feed snapshot'ını diske atomik olarak yazar."""
+    path = _snapshot_path(url)
+    tmp_path = f"{path}.tmp"
+    snapshot = {
+        "url": url,
+        "etag": etag,
+        "modified": modified,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "items": items
+    }
+    
+    try:
+        os.makedirs(FEED_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Feed snapshot yazılamadı: {e}")
+
+
+def parse_rss_feed(url: str = RSS_FEED_URL, use_cache: bool = True) -> List[Dict]:
+    """RSS feed'i parse eder ve tüm haberleri döner.
+    
+    Conditional GET kullanır: sunucu 304 dönerse diskteki snapshot kullanılır.
+    Aynı çalışma içindeki tekrar çağrılar bellekteki sonucu paylaşır.
+    """
+    if use_cache and url in _feed_memo:
+        return _feed_memo[url]
+    
+    snapshot = load_feed_snapshot(url) if use_cache else None
+    
+    if snapshot:
+        feed = feedparser.parse(url, etag=snapshot.get("etag"), modified=snapshot.get("modified"))
+    else:
+        feed = feedparser.parse(url)
+    
+    if snapshot and feed.get("status") == 304:
+        print("RSS feed değişmemiş (304), snapshot kullanılıyor.")
+        news_items = snapshot.get("items", [])
+        _feed_memo[url] = news_items
+        return news_items
     
     if feed.bozo:
         print(f"RSS parse hatası: {feed.bozo_exception}")
+        if snapshot:
+            print("Son başarılı snapshot kullanılıyor.")
+            news_items = snapshot.get("items", [])
+            _feed_memo[url] = news_items
+            return news_items
         return []
     
-    news_items = []
-    for entry in feed.entries:
-        # Country alanını bul
-        country = None
-        if hasattr(entry, 'country'):
-            country = entry.country
-        else:
-            # Raw XML'den country çek
-            if hasattr(entry, 'get'):
-                country = entry.get('country')
+    news_items = [_entry_to_item(entry) for entry in feed.entries]
+    
+    if use_cache:
+        save_feed_snapshot(url, feed.get("etag"), feed.get("modified"), news_items)
+        _feed_memo[url] = news_items
+    
+    return news_items
+
+
+def _entry_to_item(entry) -> Dict:
+    """feedparser entry'sini haber sözlüğüne çevirir."""
+    # Custom <country> elementi feedparser tarafından entry anahtarı olarak taşınır
+    country = entry.get('country')
+    
+    news_item = {
+        'title': entry.get('title', ''),
+        'description': entry.get('description', ''),
+        'content': entry.get('content', [{}])[0].get('value', '') if entry.get('content') else entry.get('summary', ''),
+        'link': entry.get('link', ''),
+        'guid': entry.get('id', ''),
+        'published': entry.get('published', ''),
+        'published_parsed': entry.get('published_parsed'),
+        'country': country,
+        'category': entry.get('category', ''),
+        'source': entry.get('dc_creator', entry.get('author', ''))
+    }
+    return news_item
+
+
+def _local_name(tag: str) -> str:
+    """Namespace'li XML tag'inden yerel adı döner."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(elem: ET.Element, tag: str) -> str:
+    """Alt elementin metnini döner, yoksa boş string."""
+    child = elem.find(tag)
+    if child is None or child.text is None:
+        return ''
+    return child.text.strip()
+
+
+def _published_struct(published: str):
+    """RFC 822 tarihini feedparser gibi UTC struct_time'a çevirir."""
+    if not published:
+        return None
+    try:
+        dt = parsedate_to_datetime(published)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc).timetuple()
+    except Exception:
+        return None
+
+
+def _element_to_item(elem: ET.Element, country: Optional[str]) -> Dict:
+    """<item> elementini parse_rss_feed ile aynı yapıda sözlüğe çevirir."""
+    description = _child_text(elem, 'description')
+    published = _child_text(elem, 'pubDate')
+    
+    return {
+        'title': _child_text(elem, 'title'),
+        'description': description,
+        'content': _child_text(elem, f'{CONTENT_NS}encoded') or description,
+        'link': _child_text(elem, 'link'),
+        'guid': _child_text(elem, 'guid'),
+        'published': published,
+        'published_parsed': _published_struct(published),
+        'country': country,
+        'category': _child_text(elem, 'category'),
+        'source': _child_text(elem, f'{DC_NS}creator') or _child_text(elem, 'author')
+    }
+
+
+def iter_rss_items(source: Union[str, IO[bytes]] = RSS_FEED_URL,
+                   country: Optional[Union[str, Collection[str]]] = None,
+                   default_country: Optional[str] = None) -> Iterator[Dict]:
+    """RSS feed'ini streaming olarak okur ve haberleri tek tek üretir.
+    
+    country (tek kod veya kod listesi) verilirse <country> elementi eşleşmeyen
+    item'lar sözlük oluşturulmadan atlanır. <country> elementi olmayan item'lar
+    default_country ile eşleştirilir. İşlenen elementler bellekten temizlenir.
+    """
+    wanted = {country} if isinstance(country, str) else (set(country) if country is not None else None)
+    stream = None
+    try:
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            stream = urllib.request.urlopen(source, timeout=FEED_FETCH_TIMEOUT)
+            source = stream
         
-        # Alternatif: summary veya content içinden country çıkar
-        if not country:
-            for key in dir(entry):
-                if key == 'country':
-                    country = getattr(entry, key)
+        # Açık elementlerin yığını; item'ın ebeveyni (<channel>) sonda bulunur
+        open_elements = []
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                open_elements.append(elem)
+                continue
+            open_elements.pop()
+            if _local_name(elem.tag) != "item":
+                continue
+            
+            item_country = None
+            for child in elem:
+                if _local_name(child.tag) == "country":
+                    item_country = (child.text or '').strip()
                     break
+            item_country = item_country or default_country
+            
+            if wanted is None or item_country in wanted:
+                yield _element_to_item(elem, item_country)
+            
+            # İşlenen item'ı ebeveyninden çıkar, bellek feed boyutuyla büyümesin
+            elem.clear()
+            if open_elements:
+                open_elements[-1].remove(elem)
+    except ET.ParseError as e:
+        print(f"RSS streaming parse hatası: {e}")
+    except Exception as e:
+        print(f"RSS streaming okuma hatası: {e}")
+    finally:
+        if stream is not None:
+            stream.close()
+
+
+def _item_timestamp(item: Dict) -> Optional[float]:
+    """published_parsed/published alanlarından UTC epoch timestamp üretir."""
+    try:
+        if item.get('published_parsed'):
+            return datetime(*item['published_parsed'][:6], tzinfo=timezone.utc).timestamp()
+        if item.get('published'):
+            pub_date = date_parser.parse(item['published'])
+            if pub_date.tzinfo is None:
+                pub_date = pub_date.replace(tzinfo=timezone.utc)
+            return pub_date.timestamp()
+    except Exception as e:
+        print(f"Tarih parse hatası: {e}")
+    return None
+
+
+class FeedSnapshot:
+    """Parse edilmiş feed'in ülke ve yayın tarihine göre indekslenmiş hali.
+    
+    Tarihler yüklemede bir kez UTC timestamp'e ('published_ts') çevrilir,
+    içerik bir kez temizlenip 'clean_content' alanına yazılır.
+    country=None olan sorgular tüm ülkeleri kapsar.
+    """
+    
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self._by_country: Dict[Optional[str], List[Dict]] = {None: []}
+        self._by_date: Dict[Tuple[Optional[str], date], List[Dict]] = {}
+        # Ülke başına yayın zamanına göre artan sıralı (timestamp, item) listeleri
+        self._timelines: Dict[Optional[str], Tuple[List[float], List[Dict]]] = {}
+        
+        dated: Dict[Optional[str], List[Tuple[float, int, Dict]]] = {None: []}
+        for position, item in enumerate(items):
+            ts = _item_timestamp(item)
+            item['published_ts'] = ts
+            normalize_item(item)
+            country = item.get('country')
+            keys = (country, None) if country is not None else (None,)
+            
+            for key in keys:
+                self._by_country.setdefault(key, []).append(item)
+                if ts is not None:
+                    day = datetime.fromtimestamp(ts, tz=timezone.utc).date()
+                    self._by_date.setdefault((key, day), []).append(item)
+                    dated.setdefault(key, []).append((ts, position, item))
         
-        news_item = {
-            'title': entry.get('title', ''),
-            'description': entry.get('description', ''),
-            'content': entry.get('content', [{}])[0].get('value', '') if entry.get('content') else entry.get('summary', ''),
-            'link': entry.get('link', ''),
-            'published': entry.get('published', ''),
-            'published_parsed': entry.get('published_parsed'),
-            'country': country,
-            'category': entry.get('category', ''),
-            'source': entry.get('dc_creator', entry.get('author', ''))
-        }
-        news_items.append(news_item)
+        for key, entries in dated.items():
+            entries.sort(key=lambda entry: (entry[0], entry[1]))
+            self._timelines[key] = ([entry[0] for entry in entries], [entry[2] for entry in entries])
     
-    return news_items
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def countries(self) -> List[str]:
+        """Snapshot'taki ülke kodlarını döner."""
+        return [key for key in self._by_country if key is not None]
+    
+    def by_country(self, country: Optional[str]) -> List[Dict]:
+        """Ülkenin tüm haberlerini feed sırasıyla döner."""
+        return list(self._by_country.get(country, []))
+    
+    def on_date(self, country: Optional[str], day: date) -> List[Dict]:
+        """Ülkenin verilen UTC gününde yayımlanan haberlerini feed sırasıyla döner."""
+        return list(self._by_date.get((country, day), []))
+    
+    def today(self, country: Optional[str]) -> List[Dict]:
+        """Ülkenin bugün (UTC) yayımlanan haberlerini döner."""
+        return self.on_date(country, datetime.now(timezone.utc).date())
+    
+    def since(self, since: Union[datetime, float], country: Optional[str] = None) -> List[Dict]:
+        """Verilen andan sonra yayımlanan haberleri en yeniden eskiye döner."""
+        if isinstance(since, datetime):
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            since = since.timestamp()
+        
+        timestamps, timeline_items = self._timelines.get(country, ([], []))
+        start = bisect_left(timestamps, since)
+        return timeline_items[start:][::-1]
+    
+    def last_hours(self, country: Optional[str], hours: float) -> List[Dict]:
+        """Ülkenin son N saatte yayımlanan haberlerini en yeniden eskiye döner."""
+        return self.since(datetime.now(timezone.utc).timestamp() - hours * 3600, country)
+
+
+def filter_country_news(news_items: List[Dict], country: str) -> List[Dict]:
+    """Sadece verilen ülkenin haberlerini filtreler."""
+    return [item for item in news_items if item.get('country') == country]
 
 
 def filter_poland_news(news_items: List[Dict]) -> List[Dict]:
     """Sadece Polonya (country: pl) haberlerini filtreler."""
-    return [item for item in news_items if item.get('country') == 'pl']
+    return filter_country_news(news_items, 'pl')
 
 
 def filter_today_news(news_items: List[Dict]) -> List[Dict]:
@@ -81,28 +358,107 @@ def filter_today_news(news_items: List[Dict]) -> List[Dict]:
     return today_news
 
 
-def get_poland_news_today() -> List[Dict]:
-    """Ana fonksiyon: Bugünkü Polonya haberlerini döner."""
-    all_news = parse_rss_feed()
-    poland_news = filter_poland_news(all_news)
-    today_news = filter_today_news(poland_news)
+def load_feed_registry() -> List[Dict]:
+    """RSS_FEEDS ortam değişkeninden feed listesini okur, yoksa varsayılan feed'i döner."""
+    if RSS_FEEDS:
+        try:
+            feeds = json.loads(RSS_FEEDS)
+            registry = [
+                {"url": feed["url"], "country": feed.get("country")}
+                for feed in feeds if feed.get("url")
+            ]
+            if registry:
+                return registry
+        except Exception as e:
+            print(f"RSS_FEEDS okunamadı: {e}")
     
-    print(f"Toplam haber: {len(all_news)}")
-    print(f"Polonya haberleri: {len(poland_news)}")
-    print(f"Bugünkü Polonya haberleri: {len(today_news)}")
+    return [{"url": RSS_FEED_URL, "country": None}]
+
+
+def _fetch_registry_feed(feed: Dict) -> List[Dict]:
+    """Kayıt defterindeki tek bir feed'i indirir ve varsayılan ülkeyi uygular."""
+    if RSS_STREAMING:
+        return list(iter_rss_items(feed["url"], country=TARGET_COUNTRIES, default_country=feed.get("country")))
+    
+    items = parse_rss_feed(feed["url"])
+    if feed.get("country"):
+        for item in items:
+            if not item.get('country'):
+                item['country'] = feed["country"]
+    return items
+
+
+def fetch_all_feeds(registry: Optional[List[Dict]] = None, max_workers: int = FEED_FETCH_WORKERS) -> List[Dict]:
+    """Tüm feed'leri eş zamanlı indirir ve link'e göre tekilleştirerek birleştirir.
+    
+    Toplam süre en yavaş feed kadardır; sıralama kayıt defteri sırasını korur.
+    """
+    registry = registry or load_feed_registry()
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(registry)))) as executor:
+        results = list(executor.map(_fetch_registry_feed, registry))
+    
+    merged = []
+    seen_links = set()
+    for feed, items in zip(registry, results):
+        print(f"Feed okundu ({len(items)} haber): {feed['url']}")
+        for item in items:
+            link = item.get('link')
+            if link:
+                if link in seen_links:
+                    continue
+                seen_links.add(link)
+            merged.append(item)
+    
+    return merged
+
+
+def get_feed_snapshot(registry: Optional[List[Dict]] = None) -> "FeedSnapshot":
+    """Kayıtlı feed'leri bir kez yükleyip indeksli FeedSnapshot olarak döner.
+    
+    RSS_STREAMING açıksa sadece TARGET_COUNTRIES haberleri streaming parser ile yüklenir.
+    """
+    registry = registry or load_feed_registry()
+    memo_key = "|".join(feed["url"] for feed in registry)
+    if memo_key in _snapshot_memo:
+        return _snapshot_memo[memo_key]
+    
+    items = fetch_all_feeds(registry)
+    print(f"Toplam haber: {len(items)}")
+    
+    snapshot = FeedSnapshot(items)
+    _snapshot_memo[memo_key] = snapshot
+    return snapshot
+
+
+def get_country_news_today(country: str) -> List[Dict]:
+    """Ülkenin bugünkü haberlerini döner."""
+    snapshot = get_feed_snapshot()
+    today_news = snapshot.today(country)
+    
+    print(f"Haberler [{country}]: {len(snapshot.by_country(country))}")
+    print(f"Bugünkü haberler [{country}]: {len(today_news)}")
     
     return today_news
 
 
-def get_poland_news_all() -> List[Dict]:
-    """Tüm Polonya haberlerini döner (tarih filtresi olmadan)."""
-    all_news = parse_rss_feed()
-    poland_news = filter_poland_news(all_news)
+def get_country_news_all(country: str) -> List[Dict]:
+    """Ülkenin tüm haberlerini döner (tarih filtresi olmadan)."""
+    country_news = get_feed_snapshot().by_country(country)
     
-    print(f"Toplam haber: {len(all_news)}")
-    print(f"Polonya haberleri: {len(poland_news)}")
+    print(f"Haberler [{country}]: {len(country_news)}")
     
-    return poland_news
+    return country_news
+
+
+def get_poland_news_today() -> List[Dict]:
+    """Ana fonksiyon: Bugünkü Polonya haberlerini döner."""
+    return get_country_news_today('pl')
+
+
+def get_poland_news_all() -> List[Dict]:
+    """Tüm Polonya haberlerini döner (tarih filtresi olmadan)."""
+    return get_country_news_all('pl')
 
 
 if __name__ == "__main__":
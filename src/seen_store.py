@@ -0,0 +1,148 @@
+"""
+Seen Store - Paylaşılan ve değerlendirilen haberlerin parmak izlerini SQLite'ta tutar.
+LLM'e gönderilmeden önce daha önce paylaşılmış haberleri eler.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import unicodedata
+from contextlib import closing
+from typing import List, Dict, Iterable
+
+SEEN_DB_PATH = os.getenv("SEEN_DB_PATH", ".cache/seen_items.sqlite3")
+
+STATUS_EVALUATED = "evaluated"
+STATUS_POSTED = "posted"
+
+# Aday listesinden elenecek durumlar (ör. "posted,evaluated")
+SEEN_SKIP_STATUSES = [s.strip() for s in os.getenv("SEEN_SKIP_STATUSES", STATUS_POSTED).split(",") if s.strip()]
+
+# SQLite parametre sınırının altında kalmak için sorgu parça boyutu
+QUERY_CHUNK_SIZE = 500
+
+
+def _connect() -> sqlite3.Connection:
+    """Veritabanına bağlanır ve tabloyu gerekirse oluşturur."""
+    db_dir = os.path.dirname(SEEN_DB_PATH)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    
+    conn = sqlite3.connect(SEEN_DB_PATH)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_items (
+                fingerprint TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                title TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        """)
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def normalize_title(title: str) -> str:
+    """Başlığı karşılaştırma için normalize eder (küçük harf, aksansız, noktalama yok)."""
+    text = unicodedata.normalize("NFKD", title or "").casefold()
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def item_fingerprints(item: Dict) -> List[str]:
+    """Haberin parmak izlerini döner: guid/link ve normalize başlık hash'i."""
+    fingerprints = []
+    
+    identifier = item.get('guid') or item.get('link')
+    if identifier:
+        fingerprints.append(f"id:{identifier.strip()}")
+    
+    title = normalize_title(item.get('title', ''))
+    if title:
+        title_hash = hashlib.sha1(title.encode("utf-8")).hexdigest()
+        fingerprints.append(f"title:{title_hash}")
+    
+    return fingerprints
+
+
+def _lookup_statuses(conn: sqlite3.Connection, fingerprints: List[str]) -> Dict[str, str]:
+    """Parmak izlerinin kayıtlı durumlarını PRIMARY KEY indeksiyle toplu sorgular."""
+    found = {}
+    for i in range(0, len(fingerprints), QUERY_CHUNK_SIZE):
+        chunk = fingerprints[i:i + QUERY_CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT fingerprint, status FROM seen_items WHERE fingerprint IN ({placeholders})",
+            chunk
+        )
+        found.update(rows)
+    return found
+
+
+def filter_unseen(news_items: List[Dict], statuses: Iterable[str] = None) -> List[Dict]:
+    """Verilen durumlardan biriyle kayıtlı haberleri listeden çıkarır."""
+    if not news_items:
+        return news_items
+    
+    skip_statuses = set(statuses if statuses is not None else SEEN_SKIP_STATUSES)
+    
+    try:
+        fingerprints_per_item = [item_fingerprints(item) for item in news_items]
+        all_fingerprints = list({fp for fps in fingerprints_per_item for fp in fps})
+        
+        with closing(_connect()) as conn, conn:
+            found = _lookup_statuses(conn, all_fingerprints)
+    except sqlite3.Error as e:
+        print(f"Seen store okunamadı: {e}")
+        return news_items
+    
+    unseen = [
+        item for item, fps in zip(news_items, fingerprints_per_item)
+        if not any(found.get(fp) in skip_statuses for fp in fps)
+    ]
+    
+    skipped = len(news_items) - len(unseen)
+    if skipped:
+        print(f"Daha önce işlenmiş {skipped} haber elendi.")
+    
+    return unseen
+
+
+def mark_items(news_items: List[Dict], status: str) -> None:
+    """Haberleri verilen durumla kaydeder; 'posted' durumu geri düşürülmez."""
+    now = time.time()
+    rows = [
+        (fp, status, item.get('title', ''), now, now, STATUS_POSTED)
+        for item in news_items
+        for fp in item_fingerprints(item)
+    ]
+    if not rows:
+        return
+    
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.executemany("""
+                INSERT INTO seen_items (fingerprint, status, title, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(fingerprint) DO UPDATE SET
+                    status = CASE WHEN seen_items.status = ? THEN seen_items.status ELSE excluded.status END,
+                    last_seen = excluded.last_seen
+            """, rows)
+    except sqlite3.Error as e:
+        print(f"Seen store yazılamadı: {e}")
+
+
+def mark_evaluated(news_items: List[Dict]) -> None:
+    """LLM'e gönderilen aday haberleri kaydeder."""
+    mark_items(news_items, STATUS_EVALUATED)
+
+
+def mark_posted(news_item: Dict) -> None:
+    """Paylaşılan haberi kaydeder."""
+    mark_items([news_item], STATUS_POSTED)